@@ -0,0 +1,301 @@
+# Permutations, combinations and binomial coefficients. The generators here
+# are lazy, they step one arrangement at a time in place instead of building
+# the whole list, so iterating 10! permutations needs constant memory.
+
+from algos.primes import checkIfPrime
+
+
+# Narayana's algorithm. Finds the longest non-increasing suffix, swaps the
+# element before it with the smallest larger one in the suffix and reverses
+# the suffix. Amortised O(1) swaps per call.
+def nextPermutation(seq):
+    """ Rearranges the list seq into the next permutation in lexicographic
+    order. Returns False (leaving seq sorted) if seq was the last one.
+    """
+    i = len(seq) - 2
+    while i >= 0 and seq[i] >= seq[i + 1]:
+        i -= 1
+    if i < 0:
+        seq.reverse()
+        return False
+
+    j = len(seq) - 1
+    while seq[j] <= seq[i]:
+        j -= 1
+    seq[i], seq[j] = seq[j], seq[i]
+    seq[i + 1:] = seq[:i:-1]
+    return True
+
+
+# Repeated elements are fine, every distinct arrangement comes out once.
+def genAllPerms(seq):
+    """ Generates the permutations of seq as tuples in lexicographic order """
+    cur = sorted(seq)
+    while True:
+        yield tuple(cur)
+        if not nextPermutation(cur):
+            return
+
+
+# Index combinations are advanced in place, like odometer digits.
+def genCombinations(seq, k):
+    """ Generates the k element combinations of seq as tuples, in the
+    lexicographic order of positions in seq.
+    """
+    seq = list(seq)
+    n = len(seq)
+    if not 0 <= k <= n:
+        return
+
+    idx = range(k)
+    while True:
+        yield tuple(seq[i] for i in idx)
+
+        i = k - 1
+        while i >= 0 and idx[i] == n - k + i:
+            i -= 1
+        if i < 0:
+            return
+        idx[i] += 1
+        for j in xrange(i + 1, k):
+            idx[j] = idx[j - 1] + 1
+
+
+def factorial(n):
+    """ n! for non-negative n """
+    ret = 1
+    for k in xrange(2, n + 1):
+        ret *= k
+    return ret
+
+
+# Multiplicative formula, every partial product is itself a binomial, so the
+# divisions are exact.
+def choose(n, k):
+    """ Binomial coefficient n choose k, 0 if k is out of [0, n] """
+    if not 0 <= k <= n:
+        return 0
+
+    k = min(k, n - k)
+    ret = 1
+    for i in xrange(1, k + 1):
+        ret = ret * (n - k + i) // i
+    return ret
+
+
+# Factorial number system. The k-th permutation picks the (k // (n-1)!)-th
+# smallest remaining element first and so on, O(n) steps for n elements.
+def nth_permutation(seq, k):
+    """ The k-th (counting from 0) permutation of the distinct elements of seq
+    in lexicographic order, as a tuple.
+    """
+    pool = sorted(seq)
+    n = len(pool)
+    fac = factorial(n)
+    if not 0 <= k < fac:
+        raise IndexError("permutation index out of range")
+
+    ret = []
+    for m in xrange(n, 0, -1):
+        fac //= m
+        i, k = divmod(k, fac)
+        ret.append(pool.pop(i))
+    return tuple(ret)
+
+
+def perm_rank(perm):
+    """ Position (counting from 0) of perm among the permutations of its
+    distinct elements in lexicographic order, the inverse of nth_permutation.
+    """
+    pool = sorted(perm)
+    n = len(pool)
+    fac = factorial(n)
+
+    ret = 0
+    for m, x in zip(xrange(n, 0, -1), perm):
+        fac //= m
+        i = pool.index(x)
+        ret += i * fac
+        del pool[i]
+    return ret
+
+
+def digitsToNumber(digits):
+    """ The integer with the given base 10 digits, most significant first """
+    ret = 0
+    for d in digits:
+        ret = 10 * ret + d
+    return ret
+
+
+# Depth first search over arrangements of distinct digits. A branch is cut as
+# soon as its prefix fails the check, so the constraints below are written to
+# look only at the digit just placed.
+def searchDigitPerms(digits, prefixOk=None, length=None, descending=False):
+    """Generates the arrangements (as tuples) of `length' elements of digits,
+    all of whose prefixes satisfy prefixOk, in lexicographic order or its
+    reverse.
+
+    prefixOk : called with the current prefix (a list, not to be modified)
+    every time a digit is appended. Defaults to accepting everything.
+    length : defaults to all the digits.
+    """
+    pool = sorted(digits, reverse=descending)
+    if length is None:
+        length = len(pool)
+    if not 0 <= length <= len(pool):
+        return
+
+    used = [False] * len(pool)
+    prefix, chosen = [], []
+    i = 0
+    while True:
+        if len(prefix) == length:
+            yield tuple(prefix)
+            i = len(pool)
+
+        if i < len(pool):
+            # equal digits are placed in pool order, to avoid repeats.
+            if used[i] or (i and pool[i - 1] == pool[i] and not used[i - 1]):
+                i += 1
+                continue
+            prefix.append(pool[i])
+            if prefixOk is None or prefixOk(prefix):
+                used[i] = True
+                chosen.append(i)
+                i = 0
+            else:
+                prefix.pop()
+                i += 1
+            continue
+
+        # backtrack, try the next digit in place of the last one.
+        if not chosen:
+            return
+        i = chosen.pop()
+        used[i] = False
+        prefix.pop()
+        i += 1
+
+
+# Prefix checks for searchDigitPerms.
+
+def substringDivisible(divisors, width=3, start=1):
+    """Check that the `width' digit window starting at position start + j is
+    divisible by divisors[j] (positions count from 0), e.g. the 3 digit
+    windows 2..4, 3..5, ... of a pandigital number for divisors 2, 3, ...
+    """
+    divisors = list(divisors)
+
+    def check(prefix):
+        j = len(prefix) - width - start
+        if 0 <= j < len(divisors):
+            return digitsToNumber(prefix[-width:]) % divisors[j] == 0
+        return True
+    return check
+
+
+def lastDigitIn(allowed, length):
+    """ Check that the digit at position length - 1 is one of allowed """
+    allowed = frozenset(allowed)
+
+    def check(prefix):
+        return len(prefix) != length or prefix[-1] in allowed
+    return check
+
+
+def noLeadingZero(prefix):
+    """ Check that the first digit isn't 0 """
+    return len(prefix) > 1 or prefix[0] != 0
+
+
+def allOf(*checks):
+    """ Check that passes when every one of checks does """
+    def check(prefix):
+        return all(c(prefix) for c in checks)
+    return check
+
+
+def digitSumDivisible(digits, length=None, mod=3):
+    """Whether every `length' digit arrangement of digits (all of them by
+    default) has a digit sum divisible by mod. For mod 3 or 9 that means the
+    numbers themselves are all divisible, and the search can be skipped.
+    """
+    digits = list(digits)
+    if length is None or length == len(digits):
+        return sum(digits) % mod == 0
+    return all(sum(c) % mod == 0 for c in genCombinations(digits, length))
+
+
+class BinomialTable(object):
+    """Factorials of 0..n precomputed once, for answering many binomial
+    coefficient queries.
+
+    Without a modulus the values are exact big integers. With a prime modulus
+    inverse factorials are kept as well, making each query O(1) multiplications,
+    and queries with arguments beyond the table fall back to Lucas' theorem as
+    long as the table covers all the residues, i.e. n >= mod - 1.
+    """
+
+    def __init__(self, n, mod=None):
+        if n < 0:
+            raise ValueError("table size must be non-negative")
+        # inverse factorials and lucas both rely on the modulus being prime.
+        if mod is not None and not checkIfPrime(mod):
+            raise ValueError("modulus must be a prime")
+
+        self.n, self.mod = n, mod
+        fact = [1] * (n + 1)
+        for i in xrange(1, n + 1):
+            fact[i] = fact[i - 1] * i if mod is None else fact[i - 1] * i % mod
+        self._fact = fact
+
+        # queries with n below this are read off the tables directly.
+        self._direct = n + 1
+        if mod is None:
+            return
+
+        # a zero factorial (n >= mod) has no inverse, only residues below
+        # mod are needed by lucas anyway.
+        top = min(n, mod - 1)
+        invFact = [0] * (top + 1)
+        invFact[top] = pow(fact[top], mod - 2, mod)
+        for i in xrange(top, 0, -1):
+            invFact[i - 1] = invFact[i] * i % mod
+        self._invFact = invFact
+        self._direct = top + 1
+
+    def factorial(self, k):
+        """ k! (mod the modulus if any) for 0 <= k <= n """
+        return self._fact[k]
+
+    def _smallChoose(self, n, k):
+        if self.mod is None:
+            fact = self._fact
+            return fact[n] // (fact[k] * fact[n - k])
+
+        invFact, mod = self._invFact, self.mod
+        return self._fact[n] * invFact[k] * invFact[n - k] % mod
+
+    def choose(self, n, k):
+        """ n choose k, reduced by the modulus if any """
+        if not 0 <= k <= n:
+            return 0
+
+        if n < self._direct:
+            return self._smallChoose(n, k)
+
+        if self.mod is None or self.n < self.mod - 1:
+            raise ValueError("%d is beyond the table size %d" % (n, self.n))
+
+        # lucas: the product over base mod digits of (n_i choose k_i).
+        mod, ret = self.mod, 1
+        while n and ret:
+            n, ni = divmod(n, mod)
+            k, ki = divmod(k, mod)
+            ret = ret * (self._smallChoose(ni, ki) if ki <= ni else 0) % mod
+        return ret
+
+    def chooseAll(self, pairs):
+        """ List of choose(n, k) for every (n, k) in pairs """
+        return [self.choose(n, k) for n, k in pairs]
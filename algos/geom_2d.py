@@ -2,11 +2,32 @@
 Basic Vector arith-metic, polygon area, convex hull routines are implemented.
 """
 
-from math import asin, pi, sqrt
+from array import array
+from bisect import bisect_left, bisect_right
+from fractions import Fraction
+from heapq import heapify, heappop, heappush, heapreplace
+from itertools import izip, repeat
+from math import atan2, pi, sqrt
+from operator import itemgetter
+
+# numpy is optional, PointArray falls back to array('d') without it.
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 # A very small value, used for comparisions with zero.
 EPS = 1e-9
 
+# Relative rounding error of a single float operation, and the error bounds
+# (relative to the magnitude of the terms) of the float evaluations of the
+# orientation and in circle determinants, as derived by Shewchuk. A result
+# larger than its bound has the right sign, anything else is recomputed
+# exactly. Assumes no overflow or underflow.
+_ROUNDOFF = 2.0 ** -53
+_CCW_BOUND = (3 + 16 * _ROUNDOFF) * _ROUNDOFF
+_INCIRCLE_BOUND = (10 + 96 * _ROUNDOFF) * _ROUNDOFF
+
 # Points and vectors are considered different in this module.
 # All the routines accept and return (x, y) tuples for vectors and 2d points.
 
@@ -18,10 +39,81 @@ def cross_product(vec1, vec2):
        positive/negative z-axis) of the cross product.
     """
 
+    if _is_batch(vec1, vec2):
+        return _batch(lambda x1, y1, x2, y2: x1 * y2 - x2 * y1, vec1, vec2)
+
     (px1, py1), (px2, py2) = vec1, vec2
     return px1 * py2 - px2 * py1
 
 
+# Filtered predicate. ints and Fractions are exact anyway, floats are
+# evaluated in floating point first and only redone with Fractions when the
+# result is within the rounding error bound of zero.
+def orientation(pt1, pt2, pt3):
+    """Cross product of pt1->pt2 and pt1->pt3, i.e. twice the signed area of
+    the triangle. Positive if pt1, pt2, pt3 make a counter clockwise (left)
+    turn, negative for a clockwise turn and zero if they are colinear. The
+    sign is always exact.
+    """
+
+    (px1, py1), (px2, py2), (px3, py3) = pt1, pt2, pt3
+    left = (px2 - px1) * (py3 - py1)
+    right = (py2 - py1) * (px3 - px1)
+    det = left - right
+    # _ambiguous inlined, this is on the hot path of the hull routines.
+    if isinstance(det, float) and left * right > 0 and \
+            abs(det) <= _CCW_BOUND * (abs(left) + abs(right)):
+        return orientation(*[_exact_point(pt) for pt in (pt1, pt2, pt3)])
+    return det
+
+
+def _cross_diff(pt1, pt2, pt3, pt4):
+    """Cross product of pt1->pt2 and pt3->pt4, with an exact sign"""
+    (px1, py1), (px2, py2), (px3, py3), (px4, py4) = pt1, pt2, pt3, pt4
+    left = (px2 - px1) * (py4 - py3)
+    right = (py2 - py1) * (px4 - px3)
+    det = left - right
+    if isinstance(det, float) and _ambiguous(det, left, right):
+        return _cross_diff(*[_exact_point(pt) for pt in (pt1, pt2, pt3, pt4)])
+    return det
+
+
+def _ambiguous(det, left, right):
+    """Whether the float det = left - right may have the wrong sign"""
+    # with opposite signs (or a zero) there is no cancellation.
+    return left * right > 0 and \
+        abs(det) <= _CCW_BOUND * (abs(left) + abs(right))
+
+
+def in_circle(pt1, pt2, pt3, pt4):
+    """Positive if pt4 lies inside the circle through pt1, pt2, pt3 (which
+    must be in counter clockwise order), negative if it is outside and zero
+    if on the circle. Filtered like orientation, the sign is exact.
+    """
+
+    (px1, py1), (px2, py2), (px3, py3), (px4, py4) = pt1, pt2, pt3, pt4
+    adx, ady = px1 - px4, py1 - py4
+    bdx, bdy = px2 - px4, py2 - py4
+    cdx, cdy = px3 - px4, py3 - py4
+
+    bc1, bc2 = bdx * cdy, cdx * bdy
+    ca1, ca2 = cdx * ady, adx * cdy
+    ab1, ab2 = adx * bdy, bdx * ady
+    alift = adx * adx + ady * ady
+    blift = bdx * bdx + bdy * bdy
+    clift = cdx * cdx + cdy * cdy
+    det = alift * (bc1 - bc2) + blift * (ca1 - ca2) + clift * (ab1 - ab2)
+
+    if isinstance(det, float):
+        permanent = (abs(bc1) + abs(bc2)) * alift + \
+            (abs(ca1) + abs(ca2)) * blift + (abs(ab1) + abs(ab2)) * clift
+        # a zero permanent means pt4 repeats another point, det is exact.
+        if permanent and abs(det) <= _INCIRCLE_BOUND * permanent:
+            return in_circle(*[_exact_point(pt)
+                               for pt in (pt1, pt2, pt3, pt4)])
+    return det
+
+
 def dot_product(vec1, vec2):
     """Dot product of two vectors is a scalar that, when normalized, measures
     how colinear are the two input vectors. e.g. vec1.vec2/|vec1||vec2| = -1
@@ -29,6 +121,9 @@ def dot_product(vec1, vec2):
     implies that they are aligned in the same direction.
     """
 
+    if _is_batch(vec1, vec2):
+        return _batch(lambda x1, y1, x2, y2: x1 * x2 + y1 * y2, vec1, vec2)
+
     (px1, py1), (px2, py2) = vec1, vec2
     return px1 * px2 + py1 * py2
 
@@ -56,37 +151,28 @@ def scalar_mult(vec, fac):
 # turn angle is useful is polygon routines like graham's scan etc..
 def turn_angle(vec1, vec2):
     """How much angleto turn anti-clockwise as we change our direction from
-    vec1 to vec2. Units are radians"""
-
-    mag1, mag2 = [vector_magnitude(v) for v in [vec1, vec2]]
+    vec1 to vec2. Units are radians, in [0, 2pi)"""
 
     # Special case is when one of the vectors is a zero vector.
-    if mag1 <= EPS or mag2 <= EPS:
+    if not any(vec1) or not any(vec2):
         return 0
 
-    # vec1 cross vec2 = |vec1| |vec2| sin(theta) where theta is the angle
-    # b/w them.
-    norm_crossp = cross_product(vec1, vec2) / mag1 / mag2
-    norm_dotp = dot_product(vec1, vec2) / mag1 / mag2
-
-    if norm_crossp >= -EPS:
-        # turned not more than 180 degrees anti-clockwise.
-        if norm_dotp >= -EPS:
-            # not more than 90.
-            return asin(norm_crossp)
-
-        return pi - asin(norm_crossp)
-
-    # turned more than 180 degrees anti-clockwise.
-    if norm_dotp > -EPS:
-        return 2 * pi + asin(norm_crossp)
-
-    return pi - asin(norm_crossp)
+    # vec1 cross vec2 = |vec1| |vec2| sin(theta) and vec1.vec2 =
+    # |vec1| |vec2| cos(theta) where theta is the angle b/w them, atan2 needs
+    # no normalisation.
+    angle = atan2(cross_product(vec1, vec2), dot_product(vec1, vec2))
+    return angle + 2 * pi if angle < 0 else angle
 
 
 def point_dist(pt1, pt2):
     """ Euclidean distance b/w p and q"""
 
+    if _is_batch(pt1, pt2):
+        hypot = numpy.hypot if numpy is not None else \
+            lambda d_x, d_y: sqrt(d_x * d_x + d_y * d_y)
+        return _batch(lambda x1, y1, x2, y2: hypot(x2 - x1, y2 - y1),
+                      pt1, pt2)
+
     (px1, py1), (px2, py2) = pt1, pt2
     d_x, d_y = (px2 - px1, py2 - py1)
     return sqrt(d_x * d_x + d_y * d_y)
@@ -97,105 +183,297 @@ def point_dist(pt1, pt2):
 def line_equation(pt1, pt2):
     """ Equation of the line passing through p and q"""
 
-    if point_dist(pt1, pt2) <= EPS:
+    (px1, py1), (px2, py2) = pt1, pt2
+    if (px1, py1) == (px2, py2):
         # p and q are the same point.
         raise ValueError("Two points are the same")
 
-    (px1, py1), (px2, py2) = pt1, pt2
-    if abs(px1 - px2) <= EPS:
+    if px1 == px2:
         # the vertical line x = px1
         return (1.0, 0.0, -px1 + 0.0)
 
     slope = (py2 - py1) / (px2 - px1 + 0.0)
-    offset = py1 - slope * py1
+    offset = py1 - slope * px1
 
     return (slope, -1, offset)
 
 
 def point_on_segment(ptp, ptq1, ptq2):
     """Returns true if p lies on the line segment joining q1 and q2"""
-    pq1 = point_dist(ptp, ptq1)
-    pq2 = point_dist(ptp, ptq2)
-    q1q2 = point_dist(ptq1, ptq2)
 
-    # From the triangle inequality, |AB| + |BC| > |AC| unless B is colinear
-    # w.r.t A <-> C. And |AB| + |BC| = |AC| when B lies in b/w A and C.
-    return abs((pq1 + pq2) - q1q2) <= EPS
+    # colinear with the segment and within its bounding box.
+    return orientation(ptq1, ptq2, ptp) == 0 and \
+        min(ptq1[0], ptq2[0]) <= ptp[0] <= max(ptq1[0], ptq2[0]) and \
+        min(ptq1[1], ptq2[1]) <= ptp[1] <= max(ptq1[1], ptq2[1])
+
+
+def _straddles(side1, side2):
+    """Whether two orientations are on opposite sides of (or on) a line"""
+    return side1 <= 0 <= side2 or side2 <= 0 <= side1
+
+
+def segments_intersect(seg1, seg2):
+    """Whether the segments ((x1, y1), (x2, y2)) seg1 and seg2 have a point
+    in common, touching and overlapping included.
+    """
+
+    (pt1, qt1), (pt2, qt2) = seg1, seg2
+    side1, side2 = orientation(pt2, qt2, pt1), orientation(pt2, qt2, qt1)
+    if side1 == 0 and side2 == 0:
+        # colinear, or one of them is a single point.
+        return point_on_segment(pt1, pt2, qt2) or \
+            point_on_segment(qt1, pt2, qt2) or \
+            point_on_segment(pt2, pt1, qt1) or point_on_segment(qt2, pt1, qt1)
+
+    return _straddles(side1, side2) and \
+        _straddles(orientation(pt1, qt1, pt2), orientation(pt1, qt1, qt2))
 
 
 # Intersection of lines p1<->q1 and p2<->q2. Line p <-> q denotes a line
 # joining the points p and q.
 def lines_intersect(pt1, qt1, pt2, qt2, segments=False):
-    """Checks whether the given lines intersect.
+    """Checks whether the given lines intersect. Returns the point of
+    intersection, or None for parallel (or colinear) lines.
     segments : boolean value for line segments intersection.
     """
 
-    (aa1, bb1, cc1) = line_equation(pt1, qt1)
-    (aa2, bb2, cc2) = line_equation(pt2, qt2)
+    if pt1 == qt1 or pt2 == qt2:
+        raise ValueError("Two points are the same")
 
-    if abs(aa1 * bb2 - aa2 * bb1) <= EPS:
+    # Whether and where they meet is decided by the exact predicates, only
+    # the coordinates of the point are rounded.
+    denom = _cross_diff(pt1, qt1, pt2, qt2)
+    if denom == 0:
         # Parallel lines or colinear lines. Return None.
         return None
 
-    pxc = (cc2 * bb1 - cc1 * bb2) / (aa1 * bb2 - aa2 * bb1)
-    pyc = (cc2 * aa1 - cc1 * aa2) / (bb1 * aa2 - bb2 * aa1)
-
-    if segments:
-        # check whether the point lies on both the segments
-        return (pxc, pyc) if point_on_segment((pxc, pyc), pt1, qt1)\
-            and point_on_segment((pxc, pyc), pt2, qt2) else None
+    side1 = orientation(pt2, qt2, pt1)
+    if segments and not (
+            _straddles(side1, orientation(pt2, qt2, qt1)) and
+            _straddles(orientation(pt1, qt1, pt2),
+                       orientation(pt1, qt1, qt2))):
+        return None
 
-    return (pxc, pyc)
+    # pt1 + t (qt1 - pt1) is on the second line.
+    ratio = float(side1) / float(denom)
+    (px1, py1), (qx1, qy1) = pt1, qt1
+    return (px1 + ratio * (qx1 - px1), py1 + ratio * (qy1 - py1))
 
 
 # Convex hull of a set of points in 2d is the minimal convex polygon
 # that encloses(or includes) all the points in the given set.
 def convex_hull(pts):
-    """Graham's scan algorithm. Complexity is O(nlogn) where n is
+    """Andrew's monotone chain algorithm. Complexity is O(nlogn) where n is
     the no. of points in pts. Returns the hull vertices in counter clockwise
-    order.
+    order, starting from the lowest (left most among the lowest) vertex.
+    Points lying in the middle of a hull edge are not included.
 
-    pts : A list of (x, y) tuples which are points. Assumes that
-    the vertices are distinct.(Assumption not strictly necessary)
+    pts : A list of (x, y) tuples which are points, or a PointArray.
+    Duplicates are fine.
     """
-    pts = list(pts)
-    size = len(pts)
-    if size < 3:
+    if isinstance(pts, PointArray):
+        pts = _hull_candidates(pts)
+    pts = sorted(set(tuple(pt) for pt in pts))
+    if len(pts) < 2:
         return pts
 
-    # Start with the vertex with the lowest y-coordinate. (Left most
-    # one if several have the lowest y-coordinate) and call it V0.
-    (px0, py0) = pts[0]
-    for (ppx, ppy) in pts:
-        if ppy < py0 or (ppy == py0 and ppx < px0):
-            px0, py0 = ppx, ppy
-
-    # Sort the vertices according to the angle they make with the V0X+
-    pts[0], (px0, py0) = (px0, py0), pts[0]
-    pts[1:] = sorted(pts[1:],
-                     key=lambda (x, y): turn_angle((1, 0), (x - px0, y - py0
-                                                            )
-                                                   )
-                     )
-
-    # Scan through the sorted vertices in order and maintain the turn-left
-    # property.
-    def is_a_left_turn((px1, py1), (px2, py2), (px3, py3)):
-        """Returns with p2->p3 is leftwards of p1->p2"""
-
-        vec12, vec23 = (px2 - px1, py2 - py1), (px3 - px2, py3 - py2)
-        angle_turned = turn_angle(vec12, vec23)
-        return angle_turned <= pi - EPS
+    # Only the sign of the cross product is needed, so integer inputs are
+    # handled exactly, without any trigonometry or EPS comparisons.
+    def half_hull(points):
+        """Chain that only turns left, from the first point to the last"""
+        chain = []
+        for point in points:
+            while len(chain) >= 2 and \
+                    orientation(chain[-2], chain[-1], point) <= 0:
+                chain.pop()
+            chain.append(point)
+        return chain
+
+    lower, upper = half_hull(pts), half_hull(reversed(pts))
+    hull = lower[:-1] + upper[:-1]
+
+    start = min(xrange(len(hull)), key=lambda i: (hull[i][1], hull[i][0]))
+    return hull[start:] + hull[:start]
+
+
+class _HullChain(object):
+    """One half of a DynamicHull, its vertices sorted by x. sign is 1 for the
+    lower chain, which turns left, and -1 for the upper chain, which turns
+    right. Points on the outer side of the chain are those with
+    sign * orientation < 0 against the edge below (or above) them.
+    """
 
-    stack = pts[0:2]
-    for point in pts[2:]:
-        while len(stack) >= 2 and \
-                not is_a_left_turn(stack[-2], stack[-1], point):
-            stack.pop()
+    def __init__(self, sign):
+        self.sign = sign
+        self.xs = []
+        self.pts = []
+
+    def insert(self, pt):
+        """Adds pt if it extends the chain, returns whether it did"""
+        sign, xs, pts = self.sign, self.xs, self.pts
+        i = bisect_left(xs, pt[0])
+        if i < len(xs) and xs[i] == pt[0]:
+            if sign * (pt[1] - pts[i][1]) >= 0:
+                return False
+            del xs[i], pts[i]
+        elif 0 < i < len(xs) and \
+                sign * orientation(pts[i - 1], pts[i], pt) >= 0:
+            return False
+
+        xs.insert(i, pt[0])
+        pts.insert(i, pt)
+        # neighbours that no longer turn the right way are dropped, each
+        # point is dropped at most once, hence amortised O(1) of these.
+        while i + 2 < len(pts) and \
+                sign * orientation(pt, pts[i + 1], pts[i + 2]) <= 0:
+            del xs[i + 1], pts[i + 1]
+        while i >= 2 and sign * orientation(pts[i - 2], pts[i - 1], pt) <= 0:
+            del xs[i - 1], pts[i - 1]
+            i -= 1
+        return True
+
+    def covers(self, pt):
+        """Whether pt is on the inner side of (or on) the chain"""
+        sign, xs, pts = self.sign, self.xs, self.pts
+        i = bisect_left(xs, pt[0])
+        if i < len(xs) and xs[i] == pt[0]:
+            return sign * (pt[1] - pts[i][1]) >= 0
+        if i == 0 or i == len(xs):
+            return False
+        return sign * orientation(pts[i - 1], pts[i], pt) >= 0
+
+
+class _HullVertices(object):
+    """The vertices of a DynamicHull in _vertices() order, indexed straight
+    off its two chains instead of copying them
+    """
 
-        stack.append(point)
+    def __init__(self, lower, upper):
+        self._lower, self._upper = lower, upper
+        # the range of the reversed upper chain left after dropping the
+        # ends it shares with the lower one.
+        self._first, self._last = 0, len(upper)
+        if upper and lower and upper[-1] == lower[-1]:
+            self._first = 1
+        if self._last > self._first and lower and upper[0] == lower[0]:
+            self._last -= 1
+
+    def __len__(self):
+        return len(self._lower) + self._last - self._first
+
+    def __getitem__(self, i):
+        if i < len(self._lower):
+            return self._lower[i]
+        return self._upper[len(self._upper) - 1 - self._first -
+                           (i - len(self._lower))]
+
+
+# Online convex hull. The lower and upper hulls are kept as x sorted chains;
+# a new point is located by binary search, dropped if it is inside, and
+# otherwise inserted with the neighbours it makes redundant removed. The
+# chains are plain python lists, whose inserts and deletes are C level
+# memmoves, which beat a pure python balanced tree for practical sizes.
+class DynamicHull(object):
+    """Convex hull of a growing set of points. Insertion and inside tests
+    locate the point by binary search, O(logn) comparisons (amortised, for
+    insertions). hull() returns the same vertex list as convex_hull would
+    for all the points inserted so far.
+    """
 
-    return stack
+    def __init__(self, pts=()):
+        self._lower = _HullChain(1)
+        self._upper = _HullChain(-1)
+        for pt in pts:
+            self.insert(pt)
+
+    def insert(self, pt):
+        """Adds a point, returns whether the hull changed"""
+        pt = tuple(pt)
+        lower = self._lower.insert(pt)
+        upper = self._upper.insert(pt)
+        return lower or upper
+
+    def contains(self, pt):
+        """Whether pt lies inside the hull or on its boundary"""
+        return self._lower.covers(pt) and self._upper.covers(pt)
+
+    __contains__ = contains
+
+    def __len__(self):
+        return len(_HullVertices(self._lower.pts, self._upper.pts))
+
+    def _vertices(self):
+        """Hull vertices counter clockwise, from the left most lowest one"""
+        lower, upper = self._lower.pts, self._upper.pts[::-1]
+        if upper and lower and upper[0] == lower[-1]:
+            upper = upper[1:]
+        if upper and lower and upper[-1] == lower[0]:
+            upper = upper[:-1]
+        return lower + upper
+
+    def hull(self):
+        """Snapshot of the hull vertices, as convex_hull returns them"""
+        verts = self._vertices()
+        if len(verts) < 2:
+            return verts
+        start = min(xrange(len(verts)),
+                    key=lambda i: (verts[i][1], verts[i][0]))
+        return verts[start:] + verts[:start]
+
+    def tangents(self, pt):
+        """The two hull vertices touched by the tangent lines from pt, which
+        must be outside the hull. Returns (right, left): the whole hull is on
+        the left of (or on) the ray pt -> right and on the right of (or on)
+        the ray pt -> left.
+        """
+        if not self._lower.pts:
+            raise ValueError("the hull is empty")
+        if self.contains(pt):
+            raise ValueError("point is inside the hull")
+
+        verts = _HullVertices(self._lower.pts, self._upper.pts)
+        return (verts[_tangent_index(verts, pt, 1)],
+                verts[_tangent_index(verts, pt, -1)])
+
+
+# Binary search for the tangent from an outside point to a convex polygon,
+# O(logn). With sign 1 it finds the vertex t with no vertex on the right of
+# pt -> t, with -1 the one with none on its left. Each step compares the
+# directions (towards or away from pt, in the turn order) of the edges
+# leaving both ends of the current chain and of its middle, and keeps the
+# half that still contains the extreme vertex.
+def _tangent_index(verts, pt, sign):
+    """Index in verts (counter clockwise) of the tangent vertex from pt"""
+    size = len(verts)
+
+    def turn(i, j):
+        return sign * orientation(pt, verts[i % size], verts[j % size])
+
+    def is_tangent(i):
+        return turn(i + 1, i) <= 0 and turn(i - 1, i) <= 0
+
+    lo, hi = 0, size
+    while hi - lo > 2:
+        mid = (lo + hi) // 2
+        if is_tangent(mid):
+            return mid
+
+        lo_up, mid_down = turn(lo + 1, lo) > 0, turn(mid + 1, mid) < 0
+        if lo_up:
+            if mid_down or turn(lo, mid) > 0:
+                hi = mid
+            else:
+                lo = mid
+        elif not mid_down or turn(lo, mid) >= 0:
+            lo = mid
+        else:
+            hi = mid
+
+    # the ends of the remaining chain, hi wraps around to 0.
+    for i in xrange(lo, hi + 1):
+        if is_tangent(i):
+            return i % size
+    raise ValueError("point is inside the hull")
 
 
 # pts can be a list or a generator expression.
@@ -205,6 +483,9 @@ def poly_area(pts):
     first and then compute the area, if their vertices are not ordered.
     """
 
+    if isinstance(pts, PointArray):
+        return _batch_poly_area(pts)
+
     if len(pts) < 3:
         return 0
 
@@ -219,11 +500,1103 @@ def poly_area(pts):
 def tri_area(p, q, r):
     """Triangle area"""
 
+    if _is_batch(p, q, r):
+        fabs = numpy.abs if numpy is not None else abs
+        return _batch(lambda x1, y1, x2, y2, x3, y3: 0.5 * fabs(
+            (x2 - x1) * (y3 - y1) - (x3 - x1) * (y2 - y1)), p, q, r)
+
     (px1, py1), (px2, py2), (x3, y3) = p, q, r
     px2, py2, x3, y3 = px2 - px1, py2 - py1, x3 - px1, y3 - py1
     return 0.5 * abs(px2 * y3 - x3 * py2)
 
 
+# Rotating calipers. All of these take a hull in counter clockwise order, as
+# returned by convex_hull, and walk its vertices with pointers that only move
+# forward, so each runs in O(h) for h hull vertices.
+def hull_diameter(hull):
+    """Farthest pair of points, as (distance, pt1, pt2)"""
+    size = len(hull)
+    if size == 0:
+        return None
+    if size <= 2:
+        return point_dist(hull[0], hull[-1]), hull[0], hull[-1]
+
+    best, pair = -1, None
+    j = 1
+    for i in xrange(size):
+        pt1, pt2 = hull[i], hull[(i + 1) % size]
+        # the vertex farthest from the edge i, i+1 is its antipode.
+        while orientation(pt1, pt2, hull[(j + 1) % size]) > \
+                orientation(pt1, pt2, hull[j]):
+            j = (j + 1) % size
+        for cand in (pt1, pt2):
+            dist2 = _dist2(cand, hull[j])
+            if dist2 > best:
+                best, pair = dist2, (cand, hull[j])
+
+    return sqrt(best), pair[0], pair[1]
+
+
+def hull_width(hull):
+    """Minimum width, the least distance between two parallel lines that
+    enclose the hull. One of the lines always contains a hull edge.
+    """
+    size = len(hull)
+    if size < 3:
+        return 0.0
+
+    best = None
+    j = 1
+    for i in xrange(size):
+        pt1, pt2 = hull[i], hull[(i + 1) % size]
+        while orientation(pt1, pt2, hull[(j + 1) % size]) > \
+                orientation(pt1, pt2, hull[j]):
+            j = (j + 1) % size
+        width = orientation(pt1, pt2, hull[j]) / point_dist(pt1, pt2)
+        if best is None or width < best:
+            best = width
+
+    return best
+
+
+def _caliper_rectangles(hull):
+    """Yields (width, height, corners) of the enclosing rectangle with a side
+    on each hull edge, corners counter clockwise. Needs 3 or more vertices.
+    """
+    size = len(hull)
+
+    def along(edge, i):
+        return dot_product(edge, hull[i])
+
+    def above(edge, i):
+        return cross_product(edge, hull[i])
+
+    first = (hull[1][0] - hull[0][0], hull[1][1] - hull[0][1])
+    right = max(xrange(size), key=lambda i: along(first, i))
+    top = max(xrange(size), key=lambda i: above(first, i))
+    left = min(xrange(size), key=lambda i: along(first, i))
+
+    for i in xrange(size):
+        pt1, pt2 = hull[i], hull[(i + 1) % size]
+        edge = (pt2[0] - pt1[0], pt2[1] - pt1[1])
+        while along(edge, (right + 1) % size) > along(edge, right):
+            right = (right + 1) % size
+        while above(edge, (top + 1) % size) > above(edge, top):
+            top = (top + 1) % size
+        while along(edge, (left + 1) % size) < along(edge, left):
+            left = (left + 1) % size
+
+        length = vector_magnitude(edge)
+        unit = (edge[0] / length, edge[1] / length)
+        normal = (-unit[1], unit[0])
+        base = dot_product(unit, pt1)
+        low = dot_product(unit, hull[left]) - base
+        high = dot_product(unit, hull[right]) - base
+        height = (above(edge, top) - cross_product(edge, pt1)) / length
+
+        def corner(offset, lift):
+            return (pt1[0] + offset * unit[0] + lift * normal[0],
+                    pt1[1] + offset * unit[1] + lift * normal[1])
+
+        yield high - low, height, [corner(low, 0), corner(high, 0),
+                                   corner(high, height), corner(low, height)]
+
+
+def _degenerate_rectangle(hull):
+    """(width, height, corners) for hulls of fewer than 3 vertices"""
+    return point_dist(hull[0], hull[-1]), 0.0, \
+        [hull[0], hull[-1], hull[-1], hull[0]]
+
+
+def min_area_rectangle(hull):
+    """Smallest area rectangle enclosing the hull, as (area, corners) with the
+    corners in counter clockwise order. One side is always on a hull edge.
+    """
+    if not hull:
+        return None
+    if len(hull) < 3:
+        return 0.0, _degenerate_rectangle(hull)[2]
+
+    width, height, corners = min(_caliper_rectangles(hull),
+                                 key=lambda rect: rect[0] * rect[1])
+    return width * height, corners
+
+
+def min_perimeter_rectangle(hull):
+    """Smallest perimeter rectangle enclosing the hull, as (perimeter,
+    corners) with the corners in counter clockwise order.
+    """
+    if not hull:
+        return None
+    if len(hull) < 3:
+        width, height, corners = _degenerate_rectangle(hull)
+    else:
+        width, height, corners = min(_caliper_rectangles(hull),
+                                     key=lambda rect: rect[0] + rect[1])
+    return 2 * (width + height), corners
+
+
+# Spatial index. A static 2d-tree stored implicitly in flat arrays: the node
+# of the index range [lo, hi) is at (lo + hi) / 2, its left subtree is
+# [lo, mid) and its right subtree (mid, hi). Nodes at even depths split on x,
+# the odd ones on y.
+class KDTree(object):
+    """Static kd-tree over a list of (x, y) points, for nearest neighbour,
+    radius and rectangle queries. Building is O(nlogn), queries return the
+    points themselves as (x, y) tuples.
+    """
+
+    def __init__(self, pts):
+        pts = list(pts)
+        self.size = len(pts)
+        order = array('l', [0]) * self.size
+
+        # Presorting once and splitting the sorted lists stably at each
+        # level keeps the build at O(nlogn), no sort per node is needed.
+        by_x = sorted(xrange(self.size), key=lambda i: (pts[i], i))
+        by_y = sorted(xrange(self.size),
+                      key=lambda i: (pts[i][1], pts[i][0], i))
+        side = bytearray(self.size)
+        stack = [(0, by_x, by_y, 0)]
+        while stack:
+            lo, by_x, by_y, depth = stack.pop()
+            count = len(by_x)
+            if not count:
+                continue
+            mid = count // 2
+            primary, secondary = (by_x, by_y) if depth % 2 == 0 \
+                else (by_y, by_x)
+            order[lo + mid] = primary[mid]
+            for i in primary[mid + 1:]:
+                side[i] = 1
+            for i in primary[:mid + 1]:
+                side[i] = 0
+            split = primary[mid]
+            left2 = [i for i in secondary if not side[i] and i != split]
+            right2 = [i for i in secondary if side[i]]
+            if depth % 2 == 0:
+                children = ((primary[:mid], left2), (primary[mid + 1:],
+                                                     right2))
+            else:
+                children = ((left2, primary[:mid]), (right2,
+                                                     primary[mid + 1:]))
+            stack.append((lo, children[0][0], children[0][1], depth + 1))
+            stack.append((lo + mid + 1, children[1][0], children[1][1],
+                          depth + 1))
+
+        self.xs = array('d', (pts[i][0] for i in order))
+        self.ys = array('d', (pts[i][1] for i in order))
+        self._pts = [pts[i] for i in order]
+
+    def __len__(self):
+        return self.size
+
+    def nearest(self, pt, k=1):
+        """The k points closest to pt, nearest first"""
+        ptx, pty = pt
+        xs, ys = self.xs, self.ys
+        # max heap (by negated squared distance) of the best k so far.
+        best = []
+
+        def visit(lo, hi, depth):
+            if lo >= hi:
+                return
+            mid = (lo + hi) // 2
+            d_x, d_y = xs[mid] - ptx, ys[mid] - pty
+            dist2 = d_x * d_x + d_y * d_y
+            if len(best) < k:
+                heappush(best, (-dist2, mid))
+            elif dist2 < -best[0][0]:
+                heapreplace(best, (-dist2, mid))
+
+            diff = -d_x if depth % 2 == 0 else -d_y
+            near, far = ((lo, mid), (mid + 1, hi)) if diff <= 0 \
+                else ((mid + 1, hi), (lo, mid))
+            visit(near[0], near[1], depth + 1)
+            if len(best) < k or diff * diff < -best[0][0]:
+                visit(far[0], far[1], depth + 1)
+
+        if k > 0:
+            visit(0, self.size, 0)
+        return [self._pts[i] for _, i in sorted(best, reverse=True)]
+
+    def within_radius(self, pt, radius):
+        """All the points at a distance of at most radius from pt"""
+        ptx, pty = pt
+        xs, ys, rad2 = self.xs, self.ys, radius * radius
+        ret = []
+        stack = [(0, self.size, 0)]
+        while stack:
+            lo, hi, depth = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            d_x, d_y = xs[mid] - ptx, ys[mid] - pty
+            if d_x * d_x + d_y * d_y <= rad2:
+                ret.append(self._pts[mid])
+            diff = d_x if depth % 2 == 0 else d_y
+            if diff >= -radius:
+                stack.append((lo, mid, depth + 1))
+            if diff <= radius:
+                stack.append((mid + 1, hi, depth + 1))
+        return ret
+
+    def in_rectangle(self, lower_left, upper_right):
+        """All the points in the axis parallel rectangle, borders included"""
+        (xmin, ymin), (xmax, ymax) = lower_left, upper_right
+        xs, ys = self.xs, self.ys
+        ret = []
+        stack = [(0, self.size, 0)]
+        while stack:
+            lo, hi, depth = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            ptx, pty = xs[mid], ys[mid]
+            if xmin <= ptx <= xmax and ymin <= pty <= ymax:
+                ret.append(self._pts[mid])
+            coord, low, high = (ptx, xmin, xmax) if depth % 2 == 0 \
+                else (pty, ymin, ymax)
+            if low <= coord:
+                stack.append((lo, mid, depth + 1))
+            if coord <= high:
+                stack.append((mid + 1, hi, depth + 1))
+        return ret
+
+
+# Divide and conquer. Each half returns its points sorted by y as well, so
+# the strip around the dividing line is scanned in y order, where only the
+# next few points (at most 7) can be closer than the best so far.
+def closest_pair(pts):
+    """Closest pair of points, O(nlogn). Returns (distance, pt1, pt2) or None
+    if there are fewer than two points.
+    """
+    by_x = sorted(pts)
+    if len(by_x) < 2:
+        return None
+
+    def solve(lo, hi):
+        """(best squared distance, pair, points of by_x[lo:hi] by y)"""
+        if hi - lo <= 3:
+            best, pair = None, None
+            for i in xrange(lo, hi):
+                for j in xrange(i + 1, hi):
+                    dist2 = _dist2(by_x[i], by_x[j])
+                    if best is None or dist2 < best:
+                        best, pair = dist2, (by_x[i], by_x[j])
+            return best, pair, sorted(by_x[lo:hi], key=itemgetter(1))
+
+        mid = (lo + hi) // 2
+        midx = by_x[mid][0]
+        best, pair, left = solve(lo, mid)
+        best_r, pair_r, right = solve(mid, hi)
+        if best is None or (best_r is not None and best_r < best):
+            best, pair = best_r, pair_r
+        by_y = sorted(left + right, key=itemgetter(1))
+
+        strip = [pt for pt in by_y if (pt[0] - midx) ** 2 < best]
+        for i, pt1 in enumerate(strip):
+            for pt2 in strip[i + 1:i + 8]:
+                if (pt2[1] - pt1[1]) ** 2 >= best:
+                    break
+                dist2 = _dist2(pt1, pt2)
+                if dist2 < best:
+                    best, pair = dist2, (pt1, pt2)
+        return best, pair, by_y
+
+    best, (pt1, pt2), _ = solve(0, len(by_x))
+    return sqrt(best), pt1, pt2
+
+
+def _dist2((px1, py1), (px2, py2)):
+    """Squared distance, for comparisons"""
+    d_x, d_y = px2 - px1, py2 - py1
+    return d_x * d_x + d_y * d_y
+
+
+# Delaunay triangulation, by Guibas and Stolfi's divide and conquer. The
+# points are sorted once, each half is triangulated recursively and the two
+# are merged bottom up along their common tangent, deleting the edges that
+# fail the in circle test. O(nlogn) with the exact predicates above.
+#
+# The edges are half-edge pairs in flat arrays: half-edge e and its twin
+# e ^ 1 point in opposite directions, org[e] is the vertex e starts at and
+# onext[e] / oprev[e] are the next half-edges counter clockwise / clockwise
+# around that vertex. The face on the left of e continues with
+# oprev[e ^ 1]. Deleted pairs go on a free list and are reused.
+class DelaunayTriangulation(object):
+    """Delaunay triangulation of a list of (x, y) points. Vertices are
+    identified by their index in pts, repeated points are triangulated once,
+    at their first occurrence, and the other copies are left out.
+    """
+
+    def __init__(self, pts):
+        self.points = [tuple(pt) for pt in pts]
+        points = self.points
+        # stable, the first of equal points stays first.
+        order = sorted(xrange(len(points)), key=points.__getitem__)
+        order = [i for k, i in enumerate(order)
+                 if k == 0 or points[order[k - 1]] != points[i]]
+
+        self._org, self._onext, self._oprev = _guibas_stolfi(points, order)
+        self._vertex_edge = array('i', [-1]) * len(points)
+        for e, vertex in enumerate(self._org):
+            if vertex >= 0:
+                self._vertex_edge[vertex] = e
+
+    def edges(self):
+        """List of the (i, j) vertex pairs joined by an edge, i < j"""
+        org = self._org
+        return [(min(org[e], org[e + 1]), max(org[e], org[e + 1]))
+                for e in xrange(0, len(org), 2) if org[e] >= 0]
+
+    def neighbours(self, i):
+        """Vertices joined to vertex i, counter clockwise around it"""
+        org, onext = self._org, self._onext
+        start = e = self._vertex_edge[i]
+        if start < 0:
+            return []
+        ret = []
+        while True:
+            ret.append(org[e ^ 1])
+            e = onext[e]
+            if e == start:
+                return ret
+
+    def _triangle_edges(self):
+        """Generates (e, f, g), the half-edges around each triangle"""
+        org, oprev, points = self._org, self._oprev, self.points
+        for e in xrange(len(org)):
+            if org[e] < 0:
+                continue
+            f = oprev[e ^ 1]
+            g = oprev[f ^ 1]
+            # once per triangle, and the outer face of a triangular hull is
+            # a 3 cycle too, but clockwise.
+            if e < f and e < g and oprev[g ^ 1] == e and \
+                    orientation(points[org[e]], points[org[f]],
+                                points[org[g]]) > 0:
+                yield e, f, g
+
+    def triangles(self):
+        """List of the triangles as (i, j, k) vertices, counter clockwise"""
+        org = self._org
+        return [(org[e], org[f], org[g])
+                for e, f, g in self._triangle_edges()]
+
+    def voronoi(self):
+        """The dual Voronoi diagram, as (vertices, ridges). vertices are the
+        circumcentres of the triangles. Each edge (i, j) gives a ridge
+        (i, j, left, right), the part of the perpendicular bisector of sites
+        i and j between vertices left and right, the circumcentres of the
+        triangles on the left and right of i -> j. An end is None where there
+        is no triangle on that side, the ridge goes to infinity there.
+        """
+        org, points = self._org, self.points
+        face = array('i', [-1]) * len(org)
+        vertices = []
+        for e, f, g in self._triangle_edges():
+            face[e] = face[f] = face[g] = len(vertices)
+            vertices.append(circumcentre(points[org[e]], points[org[f]],
+                                         points[org[g]]))
+
+        ridges = []
+        for e in xrange(0, len(org), 2):
+            if org[e] >= 0:
+                left, right = face[e], face[e + 1]
+                ridges.append((org[e], org[e + 1],
+                               left if left >= 0 else None,
+                               right if right >= 0 else None))
+        return vertices, ridges
+
+
+def _guibas_stolfi(points, order):
+    """Half-edge arrays org, onext, oprev of the Delaunay triangulation of
+    the points with indices order, which are distinct and sorted.
+    """
+    org, onext, oprev = array('i'), array('i'), array('i')
+    free = []
+
+    def make_edge(vtx1, vtx2):
+        """New half-edge pair vtx1 -> vtx2, alone at both ends"""
+        if free:
+            e = free.pop()
+            org[e], org[e + 1] = vtx1, vtx2
+            onext[e] = oprev[e] = e
+            onext[e + 1] = oprev[e + 1] = e + 1
+        else:
+            e = len(org)
+            org.extend((vtx1, vtx2))
+            onext.extend((e, e + 1))
+            oprev.extend((e, e + 1))
+        return e
+
+    def splice(e1, e2):
+        """Joins the vertex rings of e1 and e2 if apart, splits them if not"""
+        next1, next2 = onext[e1], onext[e2]
+        onext[e1], onext[e2] = next2, next1
+        oprev[next2], oprev[next1] = e1, e2
+
+    def connect(e1, e2):
+        """New edge from the end of e1 to the start of e2, closing a face"""
+        e = make_edge(org[e1 ^ 1], org[e2])
+        splice(e, oprev[e1 ^ 1])
+        splice(e ^ 1, e2)
+        return e
+
+    def delete(e):
+        splice(e, oprev[e])
+        splice(e ^ 1, oprev[e ^ 1])
+        org[e] = org[e ^ 1] = -1
+        free.append(e & ~1)
+
+    def ccw(vtx1, vtx2, vtx3):
+        return orientation(points[vtx1], points[vtx2], points[vtx3]) > 0
+
+    def inside(vtx1, vtx2, vtx3, vtx4):
+        return in_circle(points[vtx1], points[vtx2], points[vtx3],
+                         points[vtx4]) > 0
+
+    def build(lo, hi):
+        """Triangulates order[lo:hi], returns its counter clockwise convex
+        hull edge out of the left most vertex and the clockwise one out of
+        the right most vertex.
+        """
+        if hi - lo == 2:
+            e = make_edge(order[lo], order[lo + 1])
+            return e, e ^ 1
+
+        if hi - lo == 3:
+            vtx1, vtx2, vtx3 = order[lo:hi]
+            e1, e2 = make_edge(vtx1, vtx2), make_edge(vtx2, vtx3)
+            splice(e1 ^ 1, e2)
+            turn = orientation(points[vtx1], points[vtx2], points[vtx3])
+            if turn > 0:
+                connect(e2, e1)
+                return e1, e2 ^ 1
+            if turn < 0:
+                e3 = connect(e2, e1)
+                return e3 ^ 1, e3
+            return e1, e2 ^ 1
+
+        mid = (lo + hi) // 2
+        ldo, ldi = build(lo, mid)
+        rdi, rdo = build(mid, hi)
+
+        # lower common tangent of the two halves.
+        while True:
+            if ccw(org[rdi], org[ldi], org[ldi ^ 1]):
+                ldi = oprev[ldi ^ 1]
+            elif ccw(org[ldi], org[rdi ^ 1], org[rdi]):
+                rdi = onext[rdi ^ 1]
+            else:
+                break
+
+        base = connect(rdi ^ 1, ldi)
+        if org[ldi] == org[ldo]:
+            ldo = base ^ 1
+        if org[rdi] == org[rdo]:
+            rdo = base
+
+        # zip the halves together upwards, from right to left along base.
+        while True:
+            base_org, base_dst = org[base], org[base ^ 1]
+            lcand = onext[base ^ 1]
+            if ccw(org[lcand ^ 1], base_dst, base_org):
+                while inside(base_dst, base_org, org[lcand ^ 1],
+                             org[onext[lcand] ^ 1]):
+                    nxt = onext[lcand]
+                    delete(lcand)
+                    lcand = nxt
+
+            rcand = oprev[base]
+            if ccw(org[rcand ^ 1], base_dst, base_org):
+                while inside(base_dst, base_org, org[rcand ^ 1],
+                             org[oprev[rcand] ^ 1]):
+                    nxt = oprev[rcand]
+                    delete(rcand)
+                    rcand = nxt
+
+            lvalid = ccw(org[lcand ^ 1], base_dst, base_org)
+            rvalid = ccw(org[rcand ^ 1], base_dst, base_org)
+            if not lvalid and not rvalid:
+                return ldo, rdo
+            if not lvalid or (rvalid and inside(org[lcand ^ 1], org[lcand],
+                                                org[rcand], org[rcand ^ 1])):
+                base = connect(rcand, base ^ 1)
+            else:
+                base = connect(base ^ 1, lcand ^ 1)
+
+    if len(order) >= 2:
+        build(0, len(order))
+    return org, onext, oprev
+
+
+def circumcentre(pt1, pt2, pt3):
+    """Centre of the circle through three points, which must not be
+    colinear
+    """
+    (px1, py1), (px2, py2), (px3, py3) = pt1, pt2, pt3
+    bx, by, cx, cy = px2 - px1, py2 - py1, px3 - px1, py3 - py1
+    denom = 2.0 * (bx * cy - by * cx)
+    blift, clift = bx * bx + by * by, cx * cx + cy * cy
+    return (px1 + (cy * blift - by * clift) / denom,
+            py1 + (bx * clift - cx * blift) / denom)
+
+
+# Sweep line intersection of many segments (Bentley-Ottmann). Events are the
+# endpoints and the crossings found so far, processed in (x, y) order. The
+# status list keeps the segments crossing the sweep line ordered by their y
+# there, a vertical segment being placed at the current event's y, and only
+# segments that become neighbours in it are tested against each other.
+# O((n + k)logn) comparisons for n segments and k intersection points.
+# Arithmetic is exact (ints, or Fractions for floats and crossings), so
+# touching and overlapping segments are reported reliably.
+def iter_segment_intersections(segments):
+    """Generates (point, indices) in (x, y) order of the points, for every
+    point shared by two or more of the segments, with indices being the
+    sorted positions of those segments in the input.
+
+    segments : list of ((x1, y1), (x2, y2)) pairs. The coordinates of the
+    reported points are ints or Fractions.
+    """
+    raw, segs = [], []
+    for (pt1, pt2) in segments:
+        raw.append((pt1, pt2))
+        pt1, pt2 = _exact_point(pt1), _exact_point(pt2)
+        segs.append((pt1, pt2) if pt1 <= pt2 else (pt2, pt1))
+
+    slopes = []
+    for ((px1, py1), (px2, py2)) in segs:
+        slopes.append(Fraction(py2 - py1) / (px2 - px1) if px1 != px2
+                      else float('inf'))
+
+    starts, points = {}, {}
+    for i, (pt1, pt2) in enumerate(segs):
+        if pt1 == pt2:
+            # a single point, never enters the status list.
+            points.setdefault(pt1, []).append(i)
+        else:
+            starts.setdefault(pt1, []).append(i)
+    queue = list(set(starts) | set(points) | set(pt2 for _, pt2 in segs))
+    heapify(queue)
+    queued = set(queue)
+    status = []
+
+    def y_at(i, ptx, pty):
+        """y of segment i on the sweep line at the event (ptx, pty)"""
+        (px1, py1), (px2, py2) = segs[i]
+        if px1 == px2:
+            return min(max(pty, py1), py2)
+        if ptx == px1:
+            return py1
+        if ptx == px2:
+            return py2
+        return py1 + Fraction((ptx - px1) * (py2 - py1)) / (px2 - px1)
+
+    def bound(ptx, pty, strict):
+        """First position in status with y above (or at, unless strict)
+        the event point"""
+        lo, hi = 0, len(status)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            y_mid = y_at(status[mid], ptx, pty)
+            if y_mid < pty or (strict and y_mid == pty):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def schedule(i, j, event):
+        # most neighbours never meet, the filtered predicates on the input
+        # coordinates rule them out without any Fraction arithmetic.
+        if not segments_intersect(raw[i], raw[j]):
+            return
+        crossing = _exact_segment_intersection(segs[i], segs[j])
+        if crossing is not None and crossing > event and \
+                crossing not in queued:
+            queued.add(crossing)
+            heappush(queue, crossing)
+
+    while queue:
+        event = heappop(queue)
+        queued.discard(event)
+        ptx, pty = event
+
+        first, last = bound(ptx, pty, False), bound(ptx, pty, True)
+        through = status[first:last]
+        started = starts.get(event, [])
+        involved = through + started + points.get(event, [])
+        if len(involved) > 1:
+            yield event, sorted(involved)
+
+        # segments continuing past the event, in their order right after it.
+        after = sorted([i for i in through if segs[i][1] != event] + started,
+                       key=slopes.__getitem__)
+        status[first:last] = after
+        if not after:
+            if 0 < first < len(status):
+                schedule(status[first - 1], status[first], event)
+        else:
+            if first > 0:
+                schedule(status[first - 1], after[0], event)
+            nxt = first + len(after)
+            if nxt < len(status):
+                schedule(after[-1], status[nxt], event)
+
+
+def segment_intersections(segments):
+    """List of all the (point, indices) of iter_segment_intersections"""
+    return list(iter_segment_intersections(segments))
+
+
+# Stops the sweep at the first (left most) shared point, as Shamos-Hoey does.
+def any_segments_intersect(segments):
+    """Whether any two of the segments share a point"""
+    for _ in iter_segment_intersections(segments):
+        return True
+    return False
+
+
+def _exact_point(pt):
+    """The point with float coordinates turned into exact Fractions"""
+    return tuple(Fraction(c) if isinstance(c, float) else c for c in pt)
+
+
+def _exact_segment_intersection(seg1, seg2):
+    """The single point shared by two non parallel segments, or None"""
+    ((px1, py1), (px2, py2)), ((qx1, qy1), (qx2, qy2)) = seg1, seg2
+    d_px, d_py, d_qx, d_qy = px2 - px1, py2 - py1, qx2 - qx1, qy2 - qy1
+    denom = d_px * d_qy - d_py * d_qx
+    if denom == 0:
+        return None
+
+    t_num = (qx1 - px1) * d_qy - (qy1 - py1) * d_qx
+    u_num = (qx1 - px1) * d_py - (qy1 - py1) * d_px
+    if denom < 0:
+        denom, t_num, u_num = -denom, -t_num, -u_num
+    if not (0 <= t_num <= denom and 0 <= u_num <= denom):
+        return None
+
+    t = Fraction(t_num) / denom
+    return (_simplify(px1 + t * d_px), _simplify(py1 + t * d_py))
+
+
+def _simplify(value):
+    """Integral Fractions as ints"""
+    if isinstance(value, Fraction) and value.denominator == 1:
+        return int(value.numerator)
+    return value
+
+
+# Point in polygon. Points on the boundary count as inside everywhere below.
+def point_in_polygon(pt, poly):
+    """Whether pt lies inside (or on the boundary of) the simple polygon with
+    vertices poly, in either orientation. O(n), see PolygonIndex for many
+    queries against the same polygon.
+    """
+    ptx, pty = pt
+    inside = False
+    for i in xrange(len(poly)):
+        (px1, py1), (px2, py2) = poly[i - 1], poly[i]
+        side = orientation((px1, py1), (px2, py2), pt)
+        if side == 0 and min(px1, px2) <= ptx <= max(px1, px2) and \
+                min(py1, py2) <= pty <= max(py1, py2):
+            return True
+        # crossing number, edges counted over half open x ranges.
+        if (px1 <= ptx < px2 and side > 0) or (px2 <= ptx < px1 and side < 0):
+            inside = not inside
+    return inside
+
+
+def _contains_all(index, pts):
+    """Shared batch query, vectorized by index._numpy_contains with numpy"""
+    # the vectorized filter needs the vertices exactly as float64.
+    if numpy is None or not index._float_vertices:
+        return [index.contains(pt) for pt in pts]
+    if not isinstance(pts, PointArray):
+        pts = PointArray(pts)
+    return index._numpy_contains(pts.xs, pts.ys)
+
+
+# The float evaluation of orientation, elementwise, with the error bound
+# of the scalar filter. Callers redo the rows where it is ambiguous exactly.
+def _numpy_orientation(ax, ay, bx, by, xs, ys):
+    """orientation() over arrays, and a boolean array marking the entries
+    whose sign may be wrong
+    """
+    left = (bx - ax) * (ys - ay)
+    right = (by - ay) * (xs - ax)
+    det = left - right
+    ambiguous = (left * right > 0) & \
+        (numpy.abs(det) <= _CCW_BOUND * (numpy.abs(left) + numpy.abs(right)))
+    return det, ambiguous
+
+
+def _exact_in_floats(pts):
+    """Whether float() keeps every coordinate of pts exactly"""
+    return all(float(c) == c for pt in pts for c in pt)
+
+
+def _redo_ambiguous(index, ret, doubt, xs, ys):
+    """Sets ret to index.contains for the rows marked in doubt"""
+    for i in numpy.flatnonzero(doubt):
+        ret[i] = index.contains((float(xs[i]), float(ys[i])))
+    return ret
+
+
+class ConvexPolygonIndex(object):
+    """Point location in a convex polygon given by its vertices in counter
+    clockwise order (e.g. the output of convex_hull). The polygon is seen as
+    a fan of triangles around its first vertex, and a query finds its wedge
+    by binary search, O(logn).
+    """
+
+    def __init__(self, vertices):
+        self.vertices = list(vertices)
+        self._float_vertices = _exact_in_floats(self.vertices)
+
+    def contains(self, pt):
+        """Whether pt lies in the polygon or on its boundary"""
+        verts = self.vertices
+        size = len(verts)
+        if size < 3:
+            return any(point_on_segment(pt, verts[i - 1], verts[i])
+                       for i in xrange(size))
+
+        start = verts[0]
+        if orientation(start, verts[1], pt) < 0 or \
+                orientation(start, verts[-1], pt) > 0:
+            return False
+
+        # last i with pt on the left of (or on) start -> verts[i].
+        lo, hi = 1, size - 2
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if orientation(start, verts[mid], pt) >= 0:
+                lo = mid
+            else:
+                hi = mid - 1
+        return orientation(verts[lo], verts[lo + 1], pt) >= 0
+
+    __contains__ = contains
+
+    def contains_all(self, pts):
+        """contains() for a list or PointArray of points, as a list of bools
+        or, with numpy, a boolean ndarray
+        """
+        return _contains_all(self, pts)
+
+    def _numpy_contains(self, xs, ys):
+        verts = self.vertices
+        size = len(verts)
+        if size < 3:
+            return numpy.array([self.contains(pt) for pt in
+                                izip(xs.tolist(), ys.tolist())],
+                               dtype=numpy.bool_)
+
+        vxs = numpy.array([v[0] for v in verts], dtype=numpy.float64)
+        vys = numpy.array([v[1] for v in verts], dtype=numpy.float64)
+        sx, sy = vxs[0], vys[0]
+        first, doubt = _numpy_orientation(sx, sy, vxs[1], vys[1], xs, ys)
+        last, ambiguous = _numpy_orientation(sx, sy, vxs[-1], vys[-1],
+                                             xs, ys)
+        ret = (first >= 0) & (last <= 0)
+        doubt |= ambiguous
+
+        lo = numpy.ones(len(xs), dtype=numpy.int64)
+        hi = numpy.full(len(xs), size - 2, dtype=numpy.int64)
+        while True:
+            active = lo < hi
+            if not active.any():
+                break
+            mid = (lo + hi + 1) // 2
+            turn, ambiguous = _numpy_orientation(sx, sy, vxs[mid], vys[mid],
+                                                 xs, ys)
+            doubt |= active & ambiguous
+            left = turn >= 0
+            lo = numpy.where(active & left, mid, lo)
+            hi = numpy.where(active & ~left, mid - 1, hi)
+
+        turn, ambiguous = _numpy_orientation(vxs[lo], vys[lo], vxs[lo + 1],
+                                             vys[lo + 1], xs, ys)
+        return _redo_ambiguous(self, ret & (turn >= 0), doubt | ambiguous,
+                               xs, ys)
+
+
+# Edges spanning a slab don't cross inside it, so the endpoint of one edge
+# within the x range of the other tells their order there, exactly. The
+# right endpoints are only needed when the edges share their left one.
+def _compare_in_slab(edge1, edge2):
+    """-1, 0 or 1 as edge1 is below, along or above edge2 in a slab they
+    both span, edges being (left, right) point pairs
+    """
+    (pt1, pt2), (pt3, pt4) = edge1, edge2
+    if pt1[0] > pt3[0]:
+        return -_compare_in_slab(edge2, edge1)
+
+    turn = orientation(pt1, pt2, pt3)
+    if turn == 0:
+        if pt4[0] <= pt2[0]:
+            turn = orientation(pt1, pt2, pt4)
+        else:
+            turn = -orientation(pt3, pt4, pt2)
+    return cmp(0, turn)
+
+
+class PolygonIndex(object):
+    """Point location in a simple polygon (any orientation) with slabs.
+    The distinct vertex x coordinates cut the plane into vertical slabs; no
+    two edges cross inside a slab, so the edges spanning each slab are kept
+    sorted bottom to top. A query binary searches its slab and then the no.
+    of edges below it, whose parity tells inside from outside. O(logn) per
+    query, O(n^2) memory in the worst case (O(n sqrt(n)) typically).
+    """
+
+    def __init__(self, vertices):
+        verts = [tuple(v) for v in vertices]
+        self.vertices = verts
+        self._float_vertices = _exact_in_floats(verts)
+        self._vertex_set = set(verts)
+        self._xs = sorted(set(v[0] for v in verts))
+
+        # vertical edges, x -> [(ymin, ymax)], only matter on the boundary.
+        self._verticals = {}
+        edges = []
+        for i in xrange(len(verts)):
+            pt1, pt2 = verts[i - 1], verts[i]
+            if pt1[0] == pt2[0]:
+                self._verticals.setdefault(pt1[0], []).append(
+                    (min(pt1[1], pt2[1]), max(pt1[1], pt2[1])))
+            else:
+                edges.append((pt1, pt2) if pt1 < pt2 else (pt2, pt1))
+
+        slab_edges = [[] for _ in self._xs]
+        for edge in edges:
+            first = bisect_left(self._xs, edge[0][0])
+            last = bisect_left(self._xs, edge[1][0])
+            for slab in xrange(first, last):
+                slab_edges[slab].append(edge)
+
+        # flattened, slab s owns the edges offsets[s]..offsets[s+1]-1.
+        self._edges = []
+        self._offsets = [0]
+        for slab_list in slab_edges[:-1]:
+            slab_list.sort(cmp=_compare_in_slab)
+            self._edges.extend(slab_list)
+            self._offsets.append(len(self._edges))
+
+    def _on_vertical(self, ptx, pty):
+        return any(low <= pty <= high
+                   for low, high in self._verticals.get(ptx, ()))
+
+    def contains(self, pt):
+        """Whether pt lies in the polygon or on its boundary"""
+        ptx, pty = pt
+        if pt in self._vertex_set or self._on_vertical(ptx, pty):
+            return True
+
+        slab = bisect_right(self._xs, ptx) - 1
+        if not 0 <= slab < len(self._offsets) - 1:
+            return False
+
+        # edges strictly below pt form a prefix of the slab's list.
+        first, lo, hi = self._offsets[slab], self._offsets[slab], \
+            self._offsets[slab + 1]
+        end = hi
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if orientation(self._edges[mid][0], self._edges[mid][1], pt) > 0:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        if lo < end and orientation(self._edges[lo][0], self._edges[lo][1],
+                                    pt) == 0:
+            return True
+        return (lo - first) % 2 == 1
+
+    __contains__ = contains
+
+    def contains_all(self, pts):
+        """contains() for a list or PointArray of points, as a list of bools
+        or, with numpy, a boolean ndarray
+        """
+        return _contains_all(self, pts)
+
+    def _numpy_contains(self, xs, ys):
+        if not self._edges:
+            return numpy.array([self.contains(pt) for pt in
+                                izip(xs.tolist(), ys.tolist())],
+                               dtype=numpy.bool_)
+
+        slab_xs = numpy.array(self._xs, dtype=numpy.float64)
+        offsets = numpy.array(self._offsets, dtype=numpy.int64)
+        axs, ays, bxs, bys = [numpy.array([e[k][c] for e in self._edges],
+                                          dtype=numpy.float64)
+                              for k in (0, 1) for c in (0, 1)]
+
+        slab = numpy.searchsorted(slab_xs, xs, side='right') - 1
+        valid = (slab >= 0) & (slab < len(offsets) - 1)
+        slab = numpy.where(valid, slab, 0)
+        first = offsets[slab]
+        end = numpy.where(valid, offsets[slab + 1], first)
+        lo, hi = first.copy(), end.copy()
+        last = len(self._edges) - 1
+        doubt = numpy.zeros(len(xs), dtype=numpy.bool_)
+        while True:
+            active = lo < hi
+            if not active.any():
+                break
+            mid = numpy.minimum((lo + hi) // 2, last)
+            turn, ambiguous = _numpy_orientation(axs[mid], ays[mid], bxs[mid],
+                                                 bys[mid], xs, ys)
+            doubt |= active & ambiguous
+            below = turn > 0
+            lo = numpy.where(active & below, mid + 1, lo)
+            hi = numpy.where(active & ~below, mid, hi)
+
+        at = numpy.minimum(lo, last)
+        turn, ambiguous = _numpy_orientation(axs[at], ays[at], bxs[at],
+                                             bys[at], xs, ys)
+        on_edge = (lo < end) & (turn == 0)
+        doubt |= (lo < end) & ambiguous
+        ret = valid & (on_edge | ((lo - first) % 2 == 1))
+
+        # vertices and vertical edges lie on slab borders, check those
+        # few queries one at a time.
+        doubt |= numpy.in1d(xs, slab_xs)
+        return _redo_ambiguous(self, ret, doubt, xs, ys)
+
+
+# Batch routines. A PointArray keeps the x and y coordinates of many points
+# in two flat arrays, so the vector routines above can work on all of them
+# at once instead of one tuple at a time.
+class PointArray(object):
+    """Points (or vectors) stored as two float64 coordinate arrays, numpy
+    arrays if numpy is installed and array('d') otherwise.
+
+    cross_product, dot_product, point_dist and tri_area applied to point
+    arrays (mixed with single (x, y) tuples if needed) work element wise and
+    return an array of results. poly_area and convex_hull accept a point
+    array as the list of points.
+    """
+
+    def __init__(self, pts=()):
+        pts = list(pts)
+        self.xs = _float_array(pt[0] for pt in pts)
+        self.ys = _float_array(pt[1] for pt in pts)
+
+    @classmethod
+    def from_xy(cls, xs, ys):
+        """Point array with the given coordinate sequences"""
+        ret = cls()
+        ret.xs, ret.ys = _float_array(xs), _float_array(ys)
+        if len(ret.xs) != len(ret.ys):
+            raise ValueError("x and y coordinates differ in length")
+        return ret
+
+    def __len__(self):
+        return len(self.xs)
+
+    def __getitem__(self, i):
+        return (float(self.xs[i]), float(self.ys[i]))
+
+    def __iter__(self):
+        return izip(self.xs.tolist(), self.ys.tolist())
+
+    def to_list(self):
+        """The points as a list of (x, y) tuples"""
+        return list(self)
+
+
+def _float_array(values):
+    """Float64 array of the values, numpy's if available"""
+    if numpy is not None:
+        if isinstance(values, (list, tuple, numpy.ndarray)):
+            return numpy.array(values, dtype=numpy.float64)
+        return numpy.fromiter(values, dtype=numpy.float64)
+    return array('d', values)
+
+
+def _is_batch(*args):
+    for arg in args:
+        if isinstance(arg, PointArray):
+            return True
+    return False
+
+
+def _columns(obj):
+    """(xs, ys) of a point array, or of a single point repeated"""
+    if isinstance(obj, PointArray):
+        return obj.xs, obj.ys
+    ptx, pty = obj
+    if numpy is not None:
+        return ptx, pty
+    return repeat(ptx), repeat(pty)
+
+
+def _batch(func, *args):
+    """Applies func to the coordinate columns of args. With numpy func runs
+    once on whole arrays, otherwise once per point.
+    """
+    columns = []
+    for arg in args:
+        columns.extend(_columns(arg))
+
+    if numpy is not None:
+        return func(*columns)
+    return array('d', (func(*row) for row in izip(*columns)))
+
+
+def _batch_poly_area(pts):
+    """Shoelace formula over a point array"""
+    if len(pts) < 3:
+        return 0
+
+    xs, ys = pts.xs, pts.ys
+    if numpy is not None:
+        twice = numpy.dot(xs, numpy.roll(ys, -1)) - \
+            numpy.dot(numpy.roll(xs, -1), ys)
+    else:
+        nxt = range(1, len(xs)) + [0]
+        twice = sum(xs[i] * ys[j] - xs[j] * ys[i]
+                    for i, j in enumerate(nxt))
+    return abs(0.5 * twice)
+
+
+# Akl-Toussaint heuristic. Points strictly inside the octagon of the points
+# extreme along x, y, x+y and x-y can't be on the hull, and with numpy they
+# are discarded in a few vectorized passes before the chain is built from
+# the rest.
+def _hull_candidates(pts):
+    """Points of the point array that may be hull vertices, as tuples"""
+    if numpy is None or len(pts) < 16:
+        return pts.to_list()
+
+    xs, ys = pts.xs, pts.ys
+    # extremes in counter clockwise order of their outward directions.
+    sums, diffs = xs + ys, xs - ys
+    corners = [numpy.argmin(ys), numpy.argmax(diffs), numpy.argmax(xs),
+               numpy.argmax(sums), numpy.argmax(ys), numpy.argmin(diffs),
+               numpy.argmin(xs), numpy.argmin(sums)]
+    corners = [pts[i] for i in corners]
+    if len(set(corners)) < 3:
+        # no interior to drop points from, e.g. all the points are equal.
+        return pts.to_list()
+
+    # a point is only dropped when it is inside for sure, the borderline
+    # ones are left to the exact chain.
+    inside = numpy.ones(len(xs), dtype=numpy.bool_)
+    for (ax, ay), (bx, by) in zip(corners, corners[1:] + corners[:1]):
+        if (ax, ay) != (bx, by):
+            turn, ambiguous = _numpy_orientation(ax, ay, bx, by, xs, ys)
+            inside &= (turn > 0) & ~ambiguous
+
+    keep = ~inside
+    return zip(xs[keep].tolist(), ys[keep].tolist())
+
+
 def main():
     """Do something when run as a script"""
     pass
@@ -1,74 +1,1009 @@
 # All the prime number related algorithms are implemented here.
 
+from array import array
+from binascii import hexlify, unhexlify
+from bisect import bisect_left
+from collections import deque
+from fractions import gcd
+from itertools import compress
+from random import randrange
+import mmap
+import multiprocessing
+import os
+import struct
+import sys
+import tempfile
 
-# Uses the sieve of eratosthenes algorithm. Should easily run under less
-# than a minute for n upto 10 million on even a semi decent machine.
-def getPrimeList(n):
-    """ Returns a list of primes not greater than n """
+# numpy is optional, routines taking a backend fall back to pure python
+# without it.
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
-    isPrime = [True for x in xrange(n+1)]
-    isPrime[0] = isPrime[1] = False
+BACKENDS = ('python', 'numpy')
 
-    s = int(n ** 0.5)
-    for p in xrange(2, s+1):
+# No. of odd numbers covered by one block of the segmented sieve. A block
+# is a bytearray of this size, so it comfortably fits in the L2 cache.
+SEGMENT_SIZE = 1 << 18
+
+# getPrimeList switches to the segmented sieve beyond this bound, unless told
+# otherwise explicitly.
+SEGMENT_THRESHOLD = 1 << 24
+
+
+# Newton's method on integers, exact for arbitrarily large n.
+def isqrt(n):
+    """ Largest integer r such that r*r <= n """
+    if n < 0:
+        raise ValueError("isqrt of a negative number")
+    if n == 0:
+        return 0
+
+    x = 1 << ((n.bit_length() + 1) >> 1)
+    while True:
+        y = (x + n // x) >> 1
+        if y >= x:
+            return x
+        x = y
+
+
+# Plain sieve of eratosthenes over a bytearray, used for the small bounds
+# and for the base primes of the segmented sieve.
+def _sieveFlags(n):
+    """ bytearray of n+1 flags, flags[k] is 1 iff k is a prime """
+    isPrime = bytearray([1]) * (n+1)
+    isPrime[0:2] = bytearray(min(2, n+1))
+
+    for p in xrange(2, isqrt(n)+1):
         if isPrime[p]:
-            for q in xrange(p*p, n+1, p):
-                isPrime[q] = False
+            isPrime[p*p::p] = bytearray((n - p*p) // p + 1)
+
+    return isPrime
+
+
+# Sieves the odd numbers of [lo, hi] one block at a time. Memory used is
+# O(sqrt(hi)) for the base primes plus one block, no matter how large hi is.
+def _sieveSegments(lo, hi, segSize=SEGMENT_SIZE, basePrimes=None):
+    """ Yields (start, flags) pairs, flags[i] is 1 iff start + 2*i is a prime.
+    Only odd numbers are covered, 2 has to be handled by the callers.
+
+    basePrimes : the odd primes up to sqrt(hi), sieved here if not given.
+    """
+    start = max(lo, 3) | 1
+    if start > hi:
+        return
+
+    if basePrimes is None:
+        basePrimes = getPrimeList(isqrt(hi))[1:]
+
+    while start <= hi:
+        end = min(start + 2 * segSize, hi + 1)
+        size = (end - start + 1) // 2
+        flags = bytearray([1]) * size
+
+        for p in basePrimes:
+            q = p * p
+            if q >= end:
+                break
+            if q < start:
+                q = (start + p - 1) // p * p
+                if q % 2 == 0:
+                    q += p
+
+            # q is the first odd multiple of p (other than p) in the block.
+            i = (q - start) // 2
+            if i < size:
+                flags[i::p] = bytearray((size - 1 - i) // p + 1)
+
+        yield start, flags
+        start = end if end % 2 else end + 1
+
+
+def _useNumpy(backend):
+    """ Whether a call with the given backend runs on numpy """
+    if backend not in BACKENDS:
+        raise ValueError("unknown backend %r" % (backend,))
+    return backend == 'numpy' and numpy is not None
+
+
+# flags[i] stands for 2*i + 1, the strided crossing off happens inside numpy.
+def _numpyPrimes(n):
+    """ int64 ndarray of the primes not greater than n """
+    if n < 2:
+        return numpy.zeros(0, dtype=numpy.int64)
+
+    flags = numpy.ones((n + 1) // 2, dtype=numpy.bool_)
+    flags[0] = False
+    for i in xrange(1, (isqrt(n) - 1) // 2 + 1):
+        if flags[i]:
+            p = 2 * i + 1
+            flags[p * p // 2::p] = False
+
+    odd = 2 * numpy.flatnonzero(flags).astype(numpy.int64) + 1
+    return numpy.concatenate((numpy.array([2], dtype=numpy.int64), odd))
+
+
+# Every pair d*m <= n with m >= 2 adds d to ret[d*m]. Small divisors add to
+# all their multiples in one strided add each, large divisors d > sqrt(n) are
+# added per cofactor m instead, so there are only O(sqrt(n)) numpy calls.
+def _numpyDivSum(n):
+    """ int64 ndarray of the proper divisor sums of 0..n """
+    ret = numpy.zeros(max(n, 0) + 1, dtype=numpy.int64)
+    s = isqrt(max(n, 0))
+    for d in xrange(1, s + 1):
+        ret[2 * d::d] += d
+    for m in xrange(2, n // (s + 1) + 1):
+        top = n // m
+        if top > s:
+            ret[m * (s + 1):m * top + 1:m] += numpy.arange(s + 1, top + 1)
+    return ret
+
+
+# No. of integers sieved by one task of the parallel sieve.
+PARALLEL_BLOCK = 1 << 24
+
+# Odd base primes of the range being sieved, set in every pool worker.
+_workerBasePrimes = None
+
+
+def _initSieveWorker(basePrimes):
+    global _workerBasePrimes
+    _workerBasePrimes = basePrimes
+
+
+# Largest prime a block can be packed as signed C longs for, which read back
+# as plain ints. That is 2**31 - 1 where a long is 32 bits (e.g. Windows),
+# blocks beyond it are sent as lists instead.
+_PACKED_MAX = (1 << (8 * array('l').itemsize - 1)) - 1
+
+
+def _sieveBlock(bounds):
+    """ Primes in the odd numbers of [lo, hi], as a string of packed signed
+    longs if they fit in one, else as a list
+    """
+    lo, hi = bounds
+    packed = hi <= _PACKED_MAX
+    ret = array('l') if packed else []
+    for start, flags in _sieveSegments(lo, hi, basePrimes=_workerBasePrimes):
+        ret.extend(compress(xrange(start, start + 2 * len(flags), 2), flags))
+    return ret.tostring() if packed else ret
+
+
+def _resolveProcesses(processes):
+    return multiprocessing.cpu_count() if processes is None else processes
+
+
+# Splits [lo, hi] into PARALLEL_BLOCK sized tasks for a process pool. The base
+# primes are sieved once and handed to each worker when it starts. Results
+# are collected in order and at most two tasks per process are in flight,
+# so a slow consumer does not pile up sieved blocks in memory.
+def _parallelChunks(lo, hi, processes):
+    """ Yields sequences of the odd primes of [lo, hi] in increasing order """
+    basePrimes = getPrimeList(isqrt(hi))[1:]
+    blocks = ((b, min(b + PARALLEL_BLOCK - 1, hi))
+              for b in xrange(max(lo, 3), hi + 1, PARALLEL_BLOCK))
+
+    def unpack(data):
+        if isinstance(data, list):
+            return data
+        chunk = array('l')
+        chunk.fromstring(data)
+        return chunk
+
+    pool = multiprocessing.Pool(processes, _initSieveWorker, (basePrimes,))
+    try:
+        pending = deque()
+        for bounds in blocks:
+            pending.append(pool.apply_async(_sieveBlock, (bounds,)))
+            if len(pending) >= 2 * processes:
+                yield unpack(pending.popleft().get())
+        while pending:
+            yield unpack(pending.popleft().get())
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def primes_in_range(lo, hi, processes=1):
+    """ Generates the primes p with lo <= p <= hi in increasing order
+
+    processes : no. of worker processes to sieve with, None for all cpus.
+    """
+    if lo <= 2 <= hi:
+        yield 2
+
+    processes = _resolveProcesses(processes)
+    if processes > 1:
+        for chunk in _parallelChunks(lo, hi, processes):
+            for p in chunk:
+                yield p
+        return
+
+    for start, flags in _sieveSegments(lo, hi):
+        for p in compress(xrange(start, start + 2 * len(flags), 2), flags):
+            yield p
+
+
+# Uses the sieve of eratosthenes algorithm. Large bounds are sieved block by
+# block (see primes_in_range), so the only memory that grows linearly with n
+# is the returned list itself.
+def getPrimeList(n, segmented=None, processes=1, backend='python',
+                 asArray=False):
+    """ Returns a list of primes not greater than n
+
+    processes : sieves in parallel with this many worker processes (None for
+    all cpus), implies the segmented sieve.
+    backend : 'numpy' sieves with numpy slice assignments when it's installed.
+    asArray : with the numpy backend, returns the int64 ndarray itself.
+    """
+
+    if _useNumpy(backend):
+        ret = _numpyPrimes(n)
+        return ret if asArray else ret.tolist()
+
+    if n < 2:
+        return []
+
+    processes = _resolveProcesses(processes)
+    if processes > 1:
+        ret = [2]
+        for chunk in _parallelChunks(3, n, processes):
+            ret.extend(chunk)
+        return ret
+
+    if segmented is None:
+        segmented = n > SEGMENT_THRESHOLD
+
+    if segmented:
+        return list(primes_in_range(2, n))
+
+    return list(compress(xrange(n+1), _sieveFlags(n)))
+
+
+# Residues mod 30 coprime to 30, and the position of each one among them.
+WHEEL30 = (1, 7, 11, 13, 17, 19, 23, 29)
+_WHEEL30_POS = dict((r, i) for i, r in enumerate(WHEEL30))
+
+# _WHEEL30_BIT[r] is the bit of residue r in its byte, 0 if r is not coprime
+# to 30.
+_WHEEL30_BIT = [1 << _WHEEL30_POS[r] if r in _WHEEL30_POS else 0
+                for r in xrange(30)]
+
+
+# Sieves the numbers 30*k + r for k0 <= k < k0 + turns and r in WHEEL30.
+# flags[8*t + i] stands for 30*(k0 + t) + WHEEL30[i]. For a sieving prime p
+# and a fixed residue of the cofactor m mod 30, the multiples p*m all fall on
+# the same residue and are 8*p flags apart, so each p costs 8 slice
+# assignments per block.
+def _wheelSegment(k0, turns, basePrimes):
+    """ bytearray of 8*turns flags, 1 for the primes in the block """
+    lo, size = 30 * k0, 8 * turns
+    hi = lo + 30 * turns
+    flags = bytearray([1]) * size
+    if k0 == 0:
+        flags[0] = 0
+
+    for p in basePrimes:
+        if p * p >= hi:
+            break
+        first = max(p, (lo + p - 1) // p)
+        step = 8 * p
+        for r in WHEEL30:
+            m = first + (r - first) % 30
+            q = p * m
+            i = 8 * (q // 30 - k0) + _WHEEL30_POS[q % 30]
+            if i < size:
+                flags[i::step] = bytearray((size - 1 - i) // step + 1)
+
+    return flags
+
+
+# Incremental sieve over the mod 30 wheel. Blocks double in size up to
+# SEGMENT_SIZE flags, and the base primes are re-sieved only when the square
+# root of the block end outgrows them, so both the work per prime and the
+# memory held (base primes up to sqrt of the current block plus the block
+# itself) stay proportional to what has been produced.
+def genPrimes():
+    """ Generates all the primes in increasing order, without an end """
+    for p in (2, 3, 5):
+        yield p
+
+    k0, turns = 0, 64
+    baseBound, basePrimes = 0, []
+    while True:
+        hi = 30 * (k0 + turns)
+        if baseBound * baseBound < hi:
+            baseBound = 2 * isqrt(hi) + 1
+            basePrimes = getPrimeList(baseBound)[3:]
+
+        lo = 30 * k0
+        for i in compress(xrange(8 * turns), _wheelSegment(k0, turns,
+                                                           basePrimes)):
+            yield lo + 30 * (i >> 3) + WHEEL30[i & 7]
+
+        k0 += turns
+        turns = min(2 * turns, SEGMENT_SIZE // 8)
+
+
+# Set bits in every byte value, as a bytearray.translate table.
+_POPCOUNT = bytes(bytearray(bin(b).count('1') for b in xrange(256)))
+_POPCOUNT_OF = bytearray(_POPCOUNT)
+
+# _MASK_UPTO[r] selects the wheel bits of the residues not greater than r.
+_MASK_UPTO = [sum(1 << i for i, w in enumerate(WHEEL30) if w <= r)
+              for r in xrange(30)]
+
+
+# Maps a 0/1 flag to bit i, for the residue in position i.
+_PLANE_TABLES = [bytes(bytearray((1 << i) if b else 0 for b in xrange(256)))
+                 for i in xrange(8)]
+
+
+# The flag bytes for each residue are disjoint bit planes, so the packed
+# bytes are their sum, computed on big integers rather than byte by byte.
+def _packWheelFlags(flags):
+    """ Packs 8 flags per byte, flag 8*t + i becomes bit i of byte t """
+    size = len(flags) // 8
+    if not size:
+        return bytearray()
+
+    total = 0
+    for i in xrange(8):
+        plane = flags[i::8].translate(_PLANE_TABLES[i])
+        total += int(hexlify(plane), 16)
+
+    return bytearray(unhexlify('%0*x' % (2 * size, total)))
+
+
+class PrimeBitmap(object):
+    """Primality of 0..n packed into one bit per number coprime to 30, i.e.
+    one byte for every 30 integers. Bit i of byte t is set iff 30*t + WHEEL30[i]
+    is a prime. Every RANK_BLOCK bytes the no. of primes so far is sampled,
+    so that count_upto needs at most RANK_BLOCK byte popcounts and nth_prime
+    a binary search over the samples followed by the same.
+    """
+
+    RANK_BLOCK = 64
+
+    def __init__(self, n):
+        self.n = n
+        turns = max(n, 0) // 30 + 1
+        basePrimes = getPrimeList(isqrt(30 * turns))[3:]
+
+        bits = bytearray()
+        for k0 in xrange(0, turns, SEGMENT_SIZE // 8):
+            size = min(SEGMENT_SIZE // 8, turns - k0)
+            bits += _packWheelFlags(_wheelSegment(k0, size, basePrimes))
+        bits[-1] &= _MASK_UPTO[n % 30] if n >= 0 else 0
+        self._bits = bits
+
+        counts = bits.translate(_POPCOUNT)
+        ranks = array('l', [0])
+        for j in xrange(0, len(bits), self.RANK_BLOCK):
+            ranks.append(ranks[-1] + sum(counts[j:j + self.RANK_BLOCK]))
+        self._ranks = ranks
+        self._numSmall = len([p for p in (2, 3, 5) if p <= n])
+
+    def _checkRange(self, k):
+        if k > self.n:
+            raise ValueError("%d is beyond the bitmap bound %d" % (k, self.n))
+
+    def is_prime(self, k):
+        """ Primality of k, for k <= n """
+        # the range check is inlined, this is the hot lookup of the class
+        if k > self.n:
+            self._checkRange(k)
+        if k < 7:
+            return k in (2, 3, 5)
+
+        return self._bits[k // 30] & _WHEEL30_BIT[k % 30] != 0
+
+    __contains__ = is_prime
+
+    def count_upto(self, k):
+        """ No. of primes not greater than k, for k <= n """
+        self._checkRange(k)
+        if k < 7:
+            return len([p for p in (2, 3, 5) if p <= k])
+
+        t = k // 30
+        j = t // self.RANK_BLOCK
+        partial = self._bits[j * self.RANK_BLOCK:t].translate(_POPCOUNT)
+        last = _POPCOUNT_OF[self._bits[t] & _MASK_UPTO[k % 30]]
+        return 3 + self._ranks[j] + sum(partial) + last
+
+    def __len__(self):
+        return self._numSmall + self._ranks[-1]
+
+    def nth_prime(self, i):
+        """ The i-th prime, counting from nth_prime(1) = 2 """
+        if not 1 <= i <= len(self):
+            raise IndexError("only %d primes are below %d" % (len(self),
+                                                                self.n))
+        if i <= 3:
+            return (2, 3, 5)[i - 1]
+
+        # the target is the rank-th set bit, counting from 1.
+        rank = i - 3
+        j = bisect_left(self._ranks, rank) - 1
+        seen = self._ranks[j]
+        t = j * self.RANK_BLOCK
+        while seen + _POPCOUNT_OF[self._bits[t]] < rank:
+            seen += _POPCOUNT_OF[self._bits[t]]
+            t += 1
+
+        byte = self._bits[t]
+        for pos in xrange(8):
+            if (byte >> pos) & 1:
+                seen += 1
+                if seen == rank:
+                    return 30 * t + WHEEL30[pos]
+
+
+# Primes used for trial division before running miller-rabin.
+SMALL_PRIMES = tuple(getPrimeList(100))
 
-    return [x for x in xrange(2, n+1) if isPrime[x]]
+# Pre-filter by the wheel 2*3*5*7*11*13. _WHEEL[n % WHEEL_MOD] is 0 iff n has
+# one of the wheel primes as a factor.
+WHEEL_MOD = 30030
+_WHEEL = bytearray([1]) * WHEEL_MOD
+for _p in SMALL_PRIMES[:6]:
+    _WHEEL[0::_p] = bytearray((WHEEL_MOD - 1) // _p + 1)
+del _p
 
+# (bound, bases) : testing against bases is enough to decide the primality of
+# every n < bound. The last two cover all the 64-bit integers and beyond.
+MR_WITNESSES = [
+    (2047, (2,)),
+    (1373653, (2, 3)),
+    (25326001, (2, 3, 5)),
+    (3215031751, (2, 3, 5, 7)),
+    (2152302898747, (2, 3, 5, 7, 11)),
+    (3474749660383, (2, 3, 5, 7, 11, 13)),
+    (341550071728321, (2, 3, 5, 7, 11, 13, 17)),
+    (3825123056546413051, (2, 3, 5, 7, 11, 13, 17, 19, 23)),
+    (318665857834031151167461, SMALL_PRIMES[:12]),
+    (3317044064679887385961981, SMALL_PRIMES[:13]),
+]
 
-# O(sqrt(n))
-def checkIfPrime(n):
+# Random bases tried on top of the fixed ones for n beyond the last bound.
+# Error probability is at most 4**-rounds.
+MR_ROUNDS = 16
+
+# Dense batches (see are_primes) up to this bound are answered by a sieve.
+BATCH_SIEVE_LIMIT = 1 << 22
+
+
+def _millerRabin(n, bases):
+    """ Strong probable prime test of odd n > 2 to all the given bases """
+    d, s = n - 1, 0
+    while not d & 1:
+        d, s = d >> 1, s + 1
+
+    for a in bases:
+        a %= n
+        if a == 0:
+            continue
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in xrange(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+
+    return True
+
+
+# Primality of n which is known to pass the wheel filter.
+def _isPrimeOffWheel(n, rounds):
+    if n < 289:
+        return n > 1
+
+    for p in SMALL_PRIMES[6:]:
+        if n % p == 0:
+            return False
+    if n < 10201:
+        return True
+
+    for bound, bases in MR_WITNESSES:
+        if n < bound:
+            return _millerRabin(n, bases)
+
+    extra = tuple(randrange(2, n - 1) for _ in xrange(rounds))
+    return _millerRabin(n, SMALL_PRIMES[:13] + extra)
+
+
+# Deterministic miller-rabin for n < 3.3 * 10^24, probabilistic beyond that.
+# O(log(n)^3)
+def checkIfPrime(n, rounds=MR_ROUNDS):
     """ Tests the primality of n """
 
     if n < 2:
         return False
+    if not _WHEEL[n % WHEEL_MOD]:
+        return n in SMALL_PRIMES[:6]
 
-    s = int(n ** 0.5)
-    return all(n % x != 0 for x in xrange(2, s+1))
+    return _isPrimeOffWheel(n, rounds)
 
 
-# Prime factorises a positive integer.
-# O(sqrt(n))
-def factorize(n):
-    """ Prime factorises n """
+# Sieves once when the candidates are small and dense, otherwise shares the
+# wheel filter among all of them.
+def are_primes(nums, rounds=MR_ROUNDS):
+    """ Returns the list [checkIfPrime(n) for n in nums] """
+
+    nums = list(nums)
+    if not nums:
+        return []
+
+    top = max(nums)
+    if top <= BATCH_SIEVE_LIMIT or \
+            (top <= SEGMENT_THRESHOLD and top <= 16 * len(nums)):
+        flags = _sieveFlags(max(top, 1))
+        return [n > 1 and flags[n] == 1 for n in nums]
+
+    wheel, small = _WHEEL, SMALL_PRIMES[:6]
+    return [n > 1 and (_isPrimeOffWheel(n, rounds) if wheel[n % WHEEL_MOD]
+                       else n in small)
+            for n in nums]
+
+
+# spf[k] is the smallest prime factor of k, for 2 <= k <= n. Primes are
+# processed in decreasing order so that the smallest one is written last.
+def getSpfTable(n):
+    """ Smallest prime factor table of 0..n as an array of unsigned ints """
+    spf = array('I', xrange(n+1))
+    for p in reversed(getPrimeList(isqrt(n))):
+        spf[p*p::p] = array('I', [p]) * ((n - p*p) // p + 1)
+    return spf
+
+
+# Brent's variant of pollard's rho, with the gcds batched over m steps.
+def _pollardBrent(n):
+    """ A non-trivial factor of the odd composite n """
+    m = 128
+    while True:
+        y, c = randrange(1, n), randrange(1, n)
+        g = r = q = 1
+        while g == 1:
+            x = y
+            for _ in xrange(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in xrange(min(m, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = gcd(q, n)
+                k += m
+            r <<= 1
+
+        if g == n:
+            # the batched product hit 0 mod n, step back one at a time.
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % n
+                g = gcd(abs(x - ys), n)
+
+        if g != n:
+            return g
+
+
+# Prime factorises a positive integer. Numbers covered by the spf table are
+# factorised in O(log(n)), others by trial division with small primes
+# followed by pollard-brent rho on whatever remains. Roughly O(n^(1/4)).
+def factorize(n, spf=None):
+    """ Prime factorises n, returns a sorted list of (prime, exponent) """
 
-    # Loop upto sqrt(n) and check for factors
     ret = []
+    if spf is not None and n < len(spf):
+        while n > 1:
+            p, e = spf[n], 0
+            while n % p == 0:
+                n, e = n // p, e + 1
+            ret.append((p, e))
+        return ret
 
-    sqRoot = int(n ** 0.5)
-    for f in xrange(2, sqRoot+1):
-        if n % f == 0:
+    for p in SMALL_PRIMES:
+        if p * p > n:
+            break
+        if n % p == 0:
             e = 0
-            while n % f == 0:
-                n, e = n / f, e + 1
+            while n % p == 0:
+                n, e = n // p, e + 1
+            ret.append((p, e))
 
-            ret.append((f, e))
-    if n > 1:
-        ret.append((n, 1))
+    if n <= 1:
+        return ret
+    if n < 10201 or checkIfPrime(n):
+        return ret + [(n, 1)]
 
-    return ret
+    # n is composite with all its prime factors above 100.
+    counts = {}
+    stack = [n]
+    while stack:
+        m = stack.pop()
+        if checkIfPrime(m):
+            counts[m] = counts.get(m, 0) + 1
+        else:
+            d = _pollardBrent(m)
+            stack += [d, m // d]
+
+    return ret + sorted(counts.items())
 
 
 # Returns the no. of divisors(factors) of a positive integer.
-def numFactors(n):
+def numFactors(n, spf=None):
     """ Number of divisors of n """
-    primeFactors = factorize(n)
+    primeFactors = factorize(n, spf)
     ret = 1
     for (p, e) in primeFactors:
         ret = ret * (e + 1)
     return ret
 
 
+# Names of the functions getMultiplicativeTables knows about. tau is the no.
+# of divisors, sigma their sum, phi is euler's totient and mu is mobius.
+MULTIPLICATIVE_FUNCS = ('tau', 'sigma', 'phi', 'mu')
+
+
+# Linear (euler's) sieve. Every composite m is reached exactly once, as i*p
+# with p its smallest prime factor, so that f(m) follows from f(i) in O(1).
+# pp[m] is the largest power of that prime dividing m, which separates
+# f(p^e) from f(m / p^e) when p divides i as well.
+def getMultiplicativeTables(n, funcs=MULTIPLICATIVE_FUNCS):
+    """ Tables of the requested multiplicative functions over 0..n, as a
+    dict mapping the function name to an array of signed longs.
+    """
+
+    unknown = set(funcs) - set(MULTIPLICATIVE_FUNCS)
+    if unknown:
+        raise ValueError("unknown functions: %s" % ', '.join(sorted(unknown)))
+
+    size = max(n+1, 2)
+    tables = dict((f, array('l', [0]) * size) for f in funcs)
+    for table in tables.values():
+        table[1] = 1
+    tau, sigma, phi, mu = [tables.get(f) for f in MULTIPLICATIVE_FUNCS]
+
+    lp = array('l', [0]) * size
+    pp = array('l', [0]) * size
+    plist = []
+    for i in xrange(2, n+1):
+        if lp[i] == 0:
+            lp[i] = pp[i] = i
+            plist.append(i)
+            if tau is not None:
+                tau[i] = 2
+            if sigma is not None:
+                sigma[i] = i + 1
+            if phi is not None:
+                phi[i] = i - 1
+            if mu is not None:
+                mu[i] = -1
+
+        lpi = lp[i]
+        for p in plist:
+            m = i * p
+            if m > n:
+                break
+            lp[m] = p
+
+            if p < lpi:
+                # p is coprime to i.
+                pp[m] = p
+                if tau is not None:
+                    tau[m] = tau[i] * 2
+                if sigma is not None:
+                    sigma[m] = sigma[i] * (p + 1)
+                if phi is not None:
+                    phi[m] = phi[i] * (p - 1)
+                if mu is not None:
+                    mu[m] = -mu[i]
+                continue
+
+            q = pp[i] * p
+            pp[m] = q
+            if q == m:
+                # m = p^e, extend the values at p^(e-1) = i.
+                if tau is not None:
+                    tau[m] = tau[i] + 1
+                if sigma is not None:
+                    sigma[m] = sigma[i] * p + 1
+                if phi is not None:
+                    phi[m] = phi[i] * p
+            else:
+                r = m // q
+                if tau is not None:
+                    tau[m] = tau[r] * tau[q]
+                if sigma is not None:
+                    sigma[m] = sigma[r] * sigma[q]
+                if phi is not None:
+                    phi[m] = phi[r] * phi[q]
+            # mu[m] stays 0, p^2 divides m.
+            break
+
+    if n < 1:
+        for f in tables:
+            tables[f] = tables[f][:n+1]
+    return tables
+
+
 # Returns an array of proper divisor sums of 1..n
-def getDivSum(n):
-    """ Proper divisor sums """
-    ret = [0] * (n+1)
-    for d in xrange(1, n+1):
-        for m in xrange(2*d, n+1, d):
-            ret[m] += d
-    return ret
+def getDivSum(n, backend='python', asArray=False):
+    """ Proper divisor sums
+
+    backend, asArray : as in getPrimeList.
+    """
+    if _useNumpy(backend):
+        ret = _numpyDivSum(n)
+        return ret if asArray else ret.tolist()
+
+    sigma = getMultiplicativeTables(n, ('sigma',))['sigma']
+    return [0] + [sigma[k] - k for k in xrange(1, n+1)]
+
+
+# Lucy_Hedgehog's method. S(v) sums k^power over 1 < k <= v with no prime
+# factor below p, for every v of the form x // i. Sieving by p updates them as
+#     S(v) -= p^power * (S(v // p) - S(p - 1))    for v >= p*p
+# Only the 2*sqrt(x) distinct values are kept, small[v] for v <= sqrt(x) and
+# large[i] for x // i, and each pass is done with list slice assignments.
+# O(x^(3/4) / log(x)) time and O(sqrt(x)) memory.
+def _lucySum(x, power):
+    """ Sum of p^power over the primes p not greater than x, power 0 or 1 """
+
+    if x < 2:
+        return 0
+
+    if power == 0:
+        initial = lambda v: v - 1
+    else:
+        initial = lambda v: v * (v + 1) // 2 - 1
+
+    r = isqrt(x)
+    small = [initial(v) for v in xrange(r + 1)]
+    large = [0] + [initial(x // i) for i in xrange(1, r + 1)]
+
+    for p in getPrimeList(r):
+        sp = small[p - 1]
+        w = p ** power
+        p2 = p * p
+        lim = min(r, x // p2)
+
+        # x // (i*p) is large[i*p] while i*p <= r, a small value after that.
+        mid = min(lim, r // p)
+        large[1:mid + 1] = [large[i] - w * (large[i * p] - sp)
+                            for i in xrange(1, mid + 1)]
+        xp = x // p
+        large[mid + 1:lim + 1] = [large[i] - w * (small[xp // i] - sp)
+                                  for i in xrange(mid + 1, lim + 1)]
+        small[p2:] = [small[v] - w * (small[v // p] - sp)
+                      for v in xrange(p2, r + 1)]
+
+    return large[1]
+
+
+# 10^11 takes a few seconds.
+def prime_pi(x):
+    """ No. of primes not greater than x """
+    return _lucySum(x, 0)
+
+
+def prime_sum(x):
+    """ Sum of the primes not greater than x """
+    return _lucySum(x, 1)
+
+
+# Summatory functions F(x) = f(1) + ... + f(x) of the multiplicative f with
+#     sum(F(x // d) for d in 1..x) = top(x)
+# e.g. the mertens function (top = 1) and the totient sum (top = x(x+1)/2).
+# F is tabulated up to L ~ x^(2/3) by the linear sieve and computed for the
+# x // i > L in increasing order with
+#     F(v) = top(v) - sum(F(v // d) for d <= D) - sum((v//q - v//(q+1)) * F(q)
+#                                                     for q <= sqrt(v))
+# where D = v // (sqrt(v) + 1). That is O(x^(2/3)) time and memory overall.
+def _dirichletSummatory(x, func, top):
+    if x < 1:
+        return 0
+
+    limit = max(isqrt(x), int(x ** (2.0 / 3)) // 4)
+    table = getMultiplicativeTables(limit, (func,))[func]
+    small = [0] * (limit + 1)
+    for k in xrange(1, limit + 1):
+        small[k] = small[k - 1] + table[k]
+    del table
+
+    if x <= limit:
+        return small[x]
+
+    # large[i] = F(x // i) for x // i > limit.
+    count = x // (limit + 1)
+    large = [0] * (count + 1)
+    for i in xrange(count, 0, -1):
+        v = x // i
+        s = isqrt(v)
+        lastD = v // (s + 1)
+
+        # v // d is above limit exactly when d <= v // (limit + 1).
+        bigD = min(lastD, v // (limit + 1))
+        total = top(v)
+        total -= sum(large[2 * i:i * bigD + 1:i])
+        total -= sum(small[v // d] for d in xrange(bigD + 1, lastD + 1))
+        total -= sum((v // q - v // (q + 1)) * small[q]
+                     for q in xrange(1, s + 1))
+        large[i] = total
+
+    return large[1]
+
+
+def mertens(x):
+    """ Mertens function, sum of mu(k) for 1 <= k <= x """
+    return _dirichletSummatory(x, 'mu', lambda v: 1)
+
+
+def totient_sum(x):
+    """ Sum of phi(k) for 1 <= k <= x """
+    return _dirichletSummatory(x, 'phi', lambda v: v * (v + 1) // 2)
+
+
+# On disk prime cache. The file has a header (magic, bound) followed by every
+# prime up to the bound as a little endian uint32. It is memory mapped when
+# used, so repeated runs and concurrent processes share one page cached copy.
+PRIME_CACHE_MAGIC = 'PRIMEU32'
+PRIME_CACHE_FILE = 'primes-u32.bin'
+
+# Directory of the cache file, ~/.cache/miscutils unless set.
+PRIME_CACHE_ENV = 'PRIMES_CACHE_DIR'
+
+# Bounds are limited by the uint32 format.
+PRIME_CACHE_LIMIT = (1 << 32) - 1
+
+_CACHE_HEADER = struct.Struct('<8sQ')
+_CACHE_ITEM = struct.Struct('<I')
+
+# path -> (mmap, bound) of the cache files opened by this process.
+_openCaches = {}
+
+
+class MappedPrimes(object):
+    """ Read only sequence of the first `count' primes in a mapped cache """
+
+    def __init__(self, mapped, count):
+        self._mapped = mapped
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def _itemAt(self, i):
+        offset = _CACHE_HEADER.size + _CACHE_ITEM.size * i
+        return _CACHE_ITEM.unpack_from(self._mapped, offset)[0]
+
+    # unpacked by struct rather than array('I'), whose items are longs.
+    def _items(self, lo, hi):
+        """ tuple of the primes at indices lo..hi-1 """
+        offset = _CACHE_HEADER.size + _CACHE_ITEM.size * lo
+        return struct.unpack_from('<%dI' % (hi - lo), self._mapped, offset)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            lo, hi, step = key.indices(self._count)
+            if step != 1:
+                return [self[i] for i in xrange(lo, hi, step)]
+            return list(self._items(lo, max(lo, hi)))
+
+        if key < 0:
+            key += self._count
+        if not 0 <= key < self._count:
+            raise IndexError("prime index out of range")
+        return self._itemAt(key)
+
+    def __iter__(self):
+        for lo in xrange(0, self._count, SEGMENT_SIZE):
+            for p in self._items(lo, min(lo + SEGMENT_SIZE, self._count)):
+                yield p
+
+    def bisect(self, k):
+        """ No. of primes in the sequence not greater than k """
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._itemAt(mid) <= k:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def __contains__(self, k):
+        i = self.bisect(k)
+        return i > 0 and self._itemAt(i - 1) == k
+
+
+def _primeCachePath(cacheDir):
+    if cacheDir is None:
+        cacheDir = os.environ.get(PRIME_CACHE_ENV) or \
+            os.path.join(os.path.expanduser('~'), '.cache', 'miscutils')
+    return os.path.join(cacheDir, PRIME_CACHE_FILE)
+
+
+# Returns (mmap, bound), or None if there is no usable cache file.
+def _openPrimeCache(path):
+    try:
+        handle = open(path, 'rb')
+    except IOError:
+        return None
+
+    with handle:
+        size = os.fstat(handle.fileno()).st_size
+        if size < _CACHE_HEADER.size or \
+                (size - _CACHE_HEADER.size) % _CACHE_ITEM.size:
+            return None
+        mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, bound = _CACHE_HEADER.unpack_from(mapped, 0)
+    if magic != PRIME_CACHE_MAGIC:
+        mapped.close()
+        return None
+    return mapped, bound
+
+
+# Sieves into a temporary file and renames it over the cache, so readers
+# never see a partially written file.
+def _writePrimeCache(path, n):
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory)
+    except OSError:
+        if not os.path.isdir(directory):
+            raise
+
+    fd, tmpPath = tempfile.mkstemp(dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as handle:
+            handle.write(_CACHE_HEADER.pack(PRIME_CACHE_MAGIC, n))
+            if n >= 2:
+                handle.write(_CACHE_ITEM.pack(2))
+            for start, flags in _sieveSegments(3, n):
+                chunk = array('I', compress(
+                    xrange(start, start + 2 * len(flags), 2), flags))
+                if sys.byteorder == 'big':
+                    chunk.byteswap()
+                handle.write(chunk.tostring())
+        os.rename(tmpPath, path)
+    except BaseException:
+        os.remove(tmpPath)
+        raise
+
+
+# The cache grows (at least doubling) when a larger bound is requested, so
+# the first call pays for the sieve and the later ones only map the file.
+def loadPrimes(n, cacheDir=None):
+    """ Primes not greater than n, memory mapped from the on disk cache.
+
+    cacheDir : directory of the cache file, defaults to $PRIMES_CACHE_DIR
+    or ~/.cache/miscutils.
+    """
+
+    if n > PRIME_CACHE_LIMIT:
+        raise ValueError("prime cache only holds primes below 2^32")
+
+    path = _primeCachePath(cacheDir)
+    opened = _openCaches.get(path)
+    if opened is None or opened[1] < n:
+        opened = _openPrimeCache(path)
+        if opened is None or opened[1] < n:
+            bound = max(n, 2 * opened[1] if opened else n, 1000)
+            _writePrimeCache(path, min(bound, PRIME_CACHE_LIMIT))
+            opened = _openPrimeCache(path)
+        _openCaches[path] = opened
+
+    mapped, _ = opened
+    total = (len(mapped) - _CACHE_HEADER.size) // _CACHE_ITEM.size
+    return MappedPrimes(mapped, MappedPrimes(mapped, total).bisect(n))
 
 
 # Primality upto 10 million.
@@ -1,5 +1,6 @@
 # for prime number and combinatoric functions.
 from algos import primes, combinatorics
+from itertools import islice
 
 # A number that is evenly divisible by 15 gets added twice.
 def p1():
@@ -78,18 +79,7 @@ def p6():
 
 def p7():
     """ 10001st prime """
-    # Assuming the 10001st prime is less than a million
-    isPrime = [True for n in xrange(1000001)]
-
-    isPrime[1] = False
-
-    for p in xrange(2, 1001):
-        if isPrime[p]:
-            for q in xrange(p*p, 1000001, p):
-                isPrime[q] = False
-
-    primeList = [n for n in xrange(2,1000001) if isPrime[n]]
-    return primeList[10000]
+    return next(islice(primes.genPrimes(), 10000, None))
 
 def p9():
     """ a*b*c s.t a*a + b*b = c*c and a+b+c = 1000 """
@@ -103,7 +93,7 @@ def p9():
 
 def p10():
     """ Sum of all primes less than 2 million """
-    return sum(primes.getPrimeList(2000000))
+    return primes.prime_sum(1999999)
 
 
 # Goes through all the triangular numbers until one with more than
@@ -41,23 +41,7 @@ def p23():
 def p24():
     """ If we write all the permutations of digits 0-9 in lexicographic order,
     we want the millionth one in that list """
-    def factorial(n):
-        if n <= 1:
-            return 1
-        return reduce(lambda x, y:x*y, xrange(1, n+1))
-
-    digits = range(10)
-    ret, pos = '', 1000000
-    while digits:
-        n = len(digits)
-
-        # i*(n-1)! >= pos
-        i = (pos + factorial(n-1) - 1) / factorial(n-1) - 1
-        ret += str(digits[i])
-        pos -= i * factorial(n-1)
-        digits[i:i+1] = []
-    
-    return ret
+    return ''.join(map(str, combinatorics.nth_permutation(range(10), 999999)))
 
 # The first fibonacci number with 1000 digits.
 def p25():
@@ -227,19 +211,16 @@ def p34():
 
 def p35():
     """ All the numbers whose all rotations are prime numbers """
-    primeList = primes.getPrimeList(1000000)
-    primality = [False] * 1000001
-    for p in primeList:
-        primality[p] = True
+    isPrime = primes.PrimeBitmap(1000000).is_prime
 
     def rotations(s):
         n = len(s)
         return [s[i:] + s[0:i] for i in xrange(n)]
 
     def circularPrime(p):
-        return all(map(lambda p : primality[p], map(int, rotations(str(p)))))
+        return all(map(isPrime, map(int, rotations(str(p)))))
 
-    return sum(1 for p in xrange(1, 1000000) if circularPrime(p))
+    return sum(1 for p in xrange(1, 1000000) if isPrime(p) and circularPrime(p))
 
 def p36():
     """ All double palindromic numbers less than 1 million """
@@ -257,14 +238,11 @@ def p36():
 # well under the time limit.
 def p37():
     """ All truncatable prime numbers """
-    plist = primes.getPrimeList(10**7)
-    primality = [False] * (10**7)
-    for p in plist:
-        primality[p] = True
+    isPrime = primes.PrimeBitmap(10**7 - 1).is_prime
 
     def checkIfPrime(n):
         if n < 10**7:
-            return primality[n]
+            return isPrime(n)
 
         sqrt = int(n ** 0.5)
         for s in xrange(2, sqrt+1):
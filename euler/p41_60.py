@@ -1,46 +1,33 @@
 from algos import primes, combinatorics
 import time
 
-# No need to consider 9 digit numbers because every such number is divisible
-# by 3. While I couldn't prove that no such 8 digit number exists, this program
-# runs within a couple of seconds.
+# Pandigital numbers whose digit sum is a multiple of 3 (8 and 9 digit ones)
+# are all divisible by 3 and are skipped. The rest are searched from the
+# largest down, with only 1, 3, 7 and 9 allowed as the last digit, so the
+# first prime found is the answer.
 def p41():
 
     """ Largest pandigital prime """
-    res = 0
-    for d in xrange(4, 9):
+    for d in xrange(9, 0, -1):
         digits = range(1, d+1)
-        allPerms = combinatorics.genAllPerms(digits)
-        for perm in allPerms:
-            num = 0
-            for d in perm:
-                num = 10*num + d
+        if combinatorics.digitSumDivisible(digits):
+            continue
 
+        lastDigit = combinatorics.lastDigitIn([1, 3, 7, 9], d)
+        for perm in combinatorics.searchDigitPerms(digits, lastDigit,
+                                                   descending=True):
+            num = combinatorics.digitsToNumber(perm)
             if primes.checkIfPrime(num):
-                res = max(res, num)
+                return num
 
-    return res
+    return 0
 
+# Builds the numbers digit by digit and drops a prefix as soon as its latest
+# 3 digit window fails the divisibility test.
 def p42():
-    digits = range(10)
-    allPerms = combinatorics.genAllPerms(digits)
-
-    def getVal(perm):
-        return reduce(lambda x, y : 10*x+y, perm)
-
-    def check(perm):
-        primes = [2, 3, 5, 7, 11, 13, 17]
-        for i in xrange(1, 8):
-            subseq = 100*perm[i] + 10*perm[i+1] + perm[i+2]
-            if subseq % primes[i-1] != 0:
-                return False
-        return True
-        
-    ret = 0
-    for perm in allPerms:
-        if check(perm):
-            ret += getVal(perm)
-    return ret
+    check = combinatorics.substringDivisible([2, 3, 5, 7, 11, 13, 17])
+    return sum(combinatorics.digitsToNumber(perm)
+               for perm in combinatorics.searchDigitPerms(range(10), check))
 
 
 # Find the prime below 1 million that can be written as a sum of
@@ -51,9 +38,7 @@ def p50():
 
     # all the primes less than 1 million
     primeList = primes.getPrimeList(999999)
-    primality = [False] * 1000000
-    for p in primeList:
-        primality[p] = True
+    primality = primes.PrimeBitmap(999999)
 
     p,l = 2, 1
     for i in xrange(len(primeList)):
@@ -61,7 +46,7 @@ def p50():
         for j in xrange(i, len(primeList)):
             if total >= 1000000:
                 break
-            if j-i+1 > l and primality[total]:
+            if j-i+1 > l and primality.is_prime(total):
                 p, l = total, j-i+1
             total += primeList[j]
     return p
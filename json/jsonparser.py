@@ -6,17 +6,37 @@
 # readBack(string) :: when reading a json value, some times, more data is read
 #                       is read than necessary. In such a case, users of the above
 #                       apis can rewind the stream back by setting the read back.
+#
+# The input is read in large chunks into a buffer and scanned with an integer
+# cursor, whitespace, string bodies and numbers are matched with regular
+# expressions instead of a byte at a time.
 
 
 from os import sys
+import re
 import jsondata
 
+# Bytes read from the input at a time.
+CHUNK_SIZE = 1 << 16
+
+WHITESPACE = frozenset("\n\t\r ")
+DIGITS = frozenset("0123456789")
+
+# Characters that can follow a number.
+NUMBER_END = frozenset("\n\t\r ,}]")
+
+_WHITESPACE_RE = re.compile(r'[\n\t\r ]*')
+# The body of a double quoted string up to its closing quote, escaped
+# characters (a backslash and the next byte) included.
+_STRING_RE = re.compile(r'([^"\\]*(?:\\.[^"\\]*)*)"', re.S)
+_NUMBER_RE = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+
 # few primitives
 def isWhiteSpace(c):
-    return c in list("\n\t\r ")
+    return c in WHITESPACE
 
 def isDigit(c):
-    return c in list("0123456789")
+    return c in DIGITS
 
 # Implements the interface above.
 class Tokenizer:
@@ -34,46 +54,94 @@ class Tokenizer:
     
     def __init__(self, filename = None):
         if not filename:
-            filename = sys.stdin
-        self.file_handle = open(filename, 'r')
-        # read_back is empty by default, when the users of
-        # this module have read extra data, they can set this
-        # to read it again.
-        self.read_back = ''
-        # for debugging purposes.
+            self.file_handle = sys.stdin
+        else:
+            self.file_handle = open(filename, 'r')
+        # buf[pos:] is the input read from the file but not consumed yet.
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
 
     # When more data is consumed than necessary, 
     # the extra data can be pushed back so as to be able to read it again.
     def setReadBack(self, read_back):
-        self.read_back = read_back
+        if not read_back:
+            return
+        if len(read_back) <= self.pos and \
+                self.buf.startswith(read_back, self.pos - len(read_back)):
+            # the usual case, just rewind the cursor.
+            self.pos -= len(read_back)
+        else:
+            self.buf = read_back + self.buf[self.pos:]
+            self.pos = 0
+
+    # Reads the next chunk into the buffer, dropping the consumed part.
+    # Returns False at the end of input. The chunk grows with the data still
+    # pending, so a long token spanning many chunks is rescanned only
+    # O(log) times.
+    def _fill(self):
+        if self.eof:
+            return False
+        pending = len(self.buf) - self.pos
+        chunk = self.file_handle.read(max(CHUNK_SIZE, pending))
+        if not chunk:
+            self.eof = True
+            if self.file_handle is not sys.stdin:
+                self.file_handle.close()
+            return False
+        self.buf = self.buf[self.pos:] + chunk if pending else chunk
+        self.pos = 0
+        return True
 
-    # Reads a single byte from the input stream.
-    # Returns a new byte or None on failure (e.g., end of input)
-    def _readByte(self, ignore_wspc = True):
-        if self.read_back:
-            ret = self.read_back[0]
-            self.read_back = self.read_back[1:]
-            return ret
+    # Makes at least count bytes available after the cursor, unless the
+    # input ends first. Returns whether they are.
+    def _ensure(self, count):
+        while len(self.buf) - self.pos < count:
+            if not self._fill():
+                return False
+        return True
 
+    # Moves the cursor past any whitespace.
+    def _skipWhiteSpace(self):
+        if self.pos < len(self.buf) and self.buf[self.pos] not in WHITESPACE:
+            return
         while True:
-            new_byte = self.file_handle.read(1)
-            if not new_byte:
-                self.file_handle.close()
-                return ''
-            elif not isWhiteSpace(new_byte) or not ignore_wspc:
-                return new_byte
+            self.pos = _WHITESPACE_RE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or not self._fill():
+                return
 
+    # Reads a single byte from the input stream.
+    # Returns a new byte or None on failure (e.g., end of input)
+    def _readByte(self, ignore_wspc = True):
+        if ignore_wspc:
+            self._skipWhiteSpace()
+        if not self._ensure(1):
+            return ''
+        self.pos += 1
+        return self.buf[self.pos - 1]
+
+    # Returns the next non whitespace byte without consuming it, '' at the
+    # end of input.
+    def peekByte(self):
+        self._skipWhiteSpace()
+        return self.buf[self.pos:self.pos + 1]
 
     # Reads the provided string argument from the input stream.
     # returns True or False, assumes token doesn't have whitespace
-    # in it.
+    # in it. Nothing but whitespace is consumed on failure.
     def readToken(self, token):
-        for i,c in enumerate(token):
-            new_c = self._readByte()
-            if new_c != c:
-                self.setReadBack(token[0:i]+new_c)
-                return False
-        return True
+        # the common case first, this is called for every token.
+        if self.buf.startswith(token, self.pos):
+            self.pos += len(token)
+            return True
+
+        self._skipWhiteSpace()
+        if len(self.buf) - self.pos < len(token):
+            self._ensure(len(token))
+        if self.buf.startswith(token, self.pos):
+            self.pos += len(token)
+            return True
+        return False
     
     # Boolean values are either true or false. Returns the boolean
     # value on success and None on failure.
@@ -92,27 +160,26 @@ class Tokenizer:
         return None
         
     # Reads a double quoted string from the input stream. Returns the read
-    # string on success. On failure, sets the read_back and returns None.
+    # string on success, escapes are left as they are. On failure, leaves
+    # the cursor at the opening quote and returns None.
     def _readString(self):
-        ret = []
         if not self.readToken('"'):
             return None
-        cur_byte = '"'
-
-        while True:
-            new_byte = self._readByte(False)
-
-            if not new_byte:
-                # end of input.
-                self.setReadBack('"' + (''.join(ret)))
-                return None
-
-            if new_byte == '"' and cur_byte != '\\':
-                # end of the string token.
-                return ''.join(ret)
-
-            cur_byte = new_byte
-            ret.append(cur_byte)
+        match = _STRING_RE.match(self.buf, self.pos)
+        if match:
+            self.pos = match.end()
+            return match.group(1)
+
+        # the closing quote isn't in the buffer yet, the cursor stays at the
+        # opening quote until the string is complete.
+        self.pos -= 1
+        while self._fill():
+            match = _STRING_RE.match(self.buf, self.pos + 1)
+            if match:
+                self.pos = match.end()
+                return match.group(1)
+        # end of input.
+        return None
 
 
 
@@ -127,21 +194,25 @@ class Tokenizer:
     
     # Reads until the next delimiter (Comma or a bracket
     # or a right brace or whitespace) and checks for validity of the 
-    # syntax.
+    # syntax. Returns the number as a string, or None (consuming nothing)
+    # if there is no valid number here.
     def readNumber(self):
-        def canStop(c):
-            return isWhiteSpace(c) or c == ',' or c == '}'
-
-        # TODO: for now, only accepts digits.
-        ret = []
+        self._skipWhiteSpace()
+        # enough lookahead for the start of any number, longer ones are
+        # completed by the loop.
+        if len(self.buf) - self.pos < 32:
+            self._ensure(32)
         while True:
-            cur_b = self._readByte(False)
-            if not isDigit(cur_b):
-                self.setReadBack(cur_b)
+            match = _NUMBER_RE.match(self.buf, self.pos)
+            # the number may continue in the next chunk.
+            if not match or match.end() < len(self.buf) or not self._fill():
                 break
-            ret.append(cur_b)
 
-        return ''.join(ret)
+        if not match or (match.end() < len(self.buf) and
+                         self.buf[match.end()] not in NUMBER_END):
+            return None
+        self.pos = match.end()
+        return match.group()
 
 ########################### Main APIs that can be used by the user. ###########
 ######################## Also initializes the tokenizer object. ###############
@@ -158,33 +229,30 @@ def initModule(filename):
 # failure. Can read json arrays and JsonObjects, but won't rewind the stream 
 # back to original state in failure.
 def readJsonValue():
-    if tokenizer.readToken('null'):
-        return jsonparser.JsonObject.jsonNullValue
+    # Only the kind of value that can start with the next byte is tried.
+    first = tokenizer.peekByte()
+    if first == 'n' and tokenizer.readToken('null'):
+        return jsondata.JsonObject.jsonNullValue
     
     # Try for a boolean value
-    boolVal = tokenizer.readBoolean()
-    if boolVal != None:
-        return boolVal
+    if first == 't' or first == 'f':
+        return tokenizer.readBoolean()
 
-    strVal = tokenizer.readString()
-    if strVal != None:
-        return strVal
-
-    # try for a number
-    numVal = tokenizer.readNumber()
-    if numVal:
-        return numVal
+    if first == '"':
+        return tokenizer.readString()
 
     # try for a compound json object, which must start with a {
-    if tokenizer.readToken('{'):
-        tokenizer.setReadBack('{')
+    if first == '{':
         return readJsonObject()
 
-    if tokenizer.readToken('['):
-        tokenizer.setReadBack('[')
+    if first == '[':
         return readJsonArray()
-    else:
-        return None
+
+    # try for a number
+    numVal = tokenizer.readNumber()
+    if numVal:
+        return numVal
+    return None
     
 
 # Reads a json object from the input stream. Input error may be detected in 
@@ -230,6 +298,143 @@ def readJsonArray():
         json_array.append(new_val)
 
 
+######################## Streaming (event based) parsing. #####################
+
+# Events generated by readEvents, as (event, data) pairs. data is the key for
+# KEY, the value for VALUE (as readJsonValue returns it) and None otherwise.
+START_OBJECT = 'start_object'
+END_OBJECT = 'end_object'
+START_ARRAY = 'start_array'
+END_ARRAY = 'end_array'
+KEY = 'key'
+VALUE = 'value'
+
+# Reads a string, number, boolean or null value. Returns None if there is
+# none at the cursor.
+def _readScalar(tok):
+    first = tok.peekByte()
+    if first == 'n':
+        return jsondata.JsonObject.jsonNullValue if tok.readToken('null') \
+            else None
+    if first == 't' or first == 'f':
+        return tok.readBoolean()
+    if first == '"':
+        return tok.readString()
+    return tok.readNumber()
+
+# Reads the key of the next key, val pair of an object and its colon.
+def _readKeyColon(tok):
+    key = tok.readKey()
+    if key is None or not tok.readToken(':'):
+        raise ValueError("expected a key and a colon in a json object")
+    return key
+
+# Generates the events of the json value read from source (a Tokenizer,
+# the one set by initModule by default), in document order. Only the stack
+# of open objects and arrays is kept, so memory doesn't grow with the input.
+# Raises ValueError on invalid input, after the events read until then.
+def readEvents(source = None):
+    tok = source if source is not None else tokenizer
+    # '{' or '[' for each object or array still open.
+    stack = []
+
+    while True:
+        # a value starts here.
+        if tok.readToken('{'):
+            yield START_OBJECT, None
+            if tok.readToken('}'):
+                yield END_OBJECT, None
+            else:
+                stack.append('{')
+                yield KEY, _readKeyColon(tok)
+                continue
+        elif tok.readToken('['):
+            yield START_ARRAY, None
+            if tok.readToken(']'):
+                yield END_ARRAY, None
+            else:
+                stack.append('[')
+                continue
+        else:
+            value = _readScalar(tok)
+            if value is None:
+                raise ValueError("expected a json value")
+            yield VALUE, value
+
+        # the value is complete, close the containers it ends.
+        while stack:
+            if tok.readToken(','):
+                if stack[-1] == '{':
+                    yield KEY, _readKeyColon(tok)
+                break
+            if not tok.readToken('}' if stack[-1] == '{' else ']'):
+                raise ValueError("expected a comma or the end of a json "
+                                 "object or array")
+            yield (END_OBJECT if stack.pop() == '{' else END_ARRAY), None
+        else:
+            return
+
+# Materialises the value whose first event is (event, data) from the rest of
+# events, as readJsonValue would return it.
+def _buildValue(event, data, events):
+    if event == VALUE:
+        return data
+    root = jsondata.JsonObject() if event == START_OBJECT else []
+    stack = [root]
+    key = None
+    for event, data in events:
+        if event == KEY:
+            key = data
+            continue
+        if event == END_OBJECT or event == END_ARRAY:
+            stack.pop()
+            if not stack:
+                return root
+            continue
+
+        if event == START_OBJECT:
+            value = jsondata.JsonObject()
+        elif event == START_ARRAY:
+            value = []
+        else:
+            value = data
+        if isinstance(stack[-1], list):
+            stack[-1].append(value)
+        else:
+            stack[-1].addObject(key, value)
+        if event != VALUE:
+            stack.append(value)
+
+# Generates (path, value) for the values whose path is accepted by
+# selected, built as readJsonValue would, while everything else is only
+# scanned through. A path is the tuple of object keys and array indices
+# leading to the value from the top, e.g. ('items', 3, 'name'). Values
+# inside a selected one are not considered on their own.
+def readSubtrees(selected, source = None):
+    events = readEvents(source)
+    # keys and indices of the open objects and arrays, and their kinds.
+    path, kinds = [], []
+    for event, data in events:
+        if event == KEY:
+            path[-1] = data
+            continue
+        if event == END_OBJECT or event == END_ARRAY:
+            path.pop()
+            kinds.pop()
+            continue
+
+        if kinds and kinds[-1] == '[':
+            path[-1] += 1
+        if selected(tuple(path)):
+            yield tuple(path), _buildValue(event, data, events)
+        elif event == START_OBJECT:
+            path.append(None)
+            kinds.append('{')
+        elif event == START_ARRAY:
+            path.append(-1)
+            kinds.append('[')
+
+
 # If run as a script, tries to read from standard input.
 if __name__ == '__main__':
     # do something here if run as a script.
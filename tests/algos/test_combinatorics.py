@@ -0,0 +1,107 @@
+import itertools
+import unittest
+from algos import combinatorics
+
+"""Unit tests for the combinatorics module in algos package.
+"""
+
+class CombinatoricsTestCase(unittest.TestCase):
+    def testGenAllPerms(self):
+        for n in xrange(6):
+            self.assertEqual(list(combinatorics.genAllPerms(range(n))),
+                             list(itertools.permutations(range(n))))
+
+        # distinct arrangements of a multiset.
+        self.assertEqual(list(combinatorics.genAllPerms([2, 1, 1])),
+                         [(1, 1, 2), (1, 2, 1), (2, 1, 1)])
+
+    def testGenCombinations(self):
+        for n in xrange(6):
+            for k in xrange(-1, n + 2):
+                self.assertEqual(
+                    list(combinatorics.genCombinations('abcdef'[:n], k)),
+                    list(itertools.combinations('abcdef'[:n], k))
+                    if k >= 0 else [])
+
+    def testChoose(self):
+        self.assertEqual(combinatorics.choose(40, 20), 137846528820)
+        self.assertEqual(combinatorics.choose(5, 0), 1)
+        self.assertEqual(combinatorics.choose(5, 6), 0)
+        self.assertEqual(combinatorics.choose(5, -1), 0)
+        for n in xrange(20):
+            row = [combinatorics.choose(n, k) for k in xrange(n + 1)]
+            self.assertEqual(sum(row), 2 ** n)
+
+    def testUnranking(self):
+        perms = list(itertools.permutations('abcde'))
+        for k, perm in enumerate(perms):
+            self.assertEqual(combinatorics.nth_permutation('edcba', k), perm)
+            self.assertEqual(combinatorics.perm_rank(perm), k)
+
+        self.assertEqual(
+            ''.join(map(str, combinatorics.nth_permutation(range(10),
+                                                           999999))),
+            '2783915460')
+        self.assertRaises(IndexError, combinatorics.nth_permutation, 'abc', 6)
+
+    def testSearchDigitPerms(self):
+        # without constraints it is a plain lexicographic enumeration.
+        self.assertEqual(list(combinatorics.searchDigitPerms([3, 1, 2])),
+                         list(itertools.permutations([1, 2, 3])))
+        self.assertEqual(
+            list(combinatorics.searchDigitPerms([1, 2, 3], length=2,
+                                                descending=True)),
+            sorted(itertools.permutations([1, 2, 3], 2), reverse=True))
+        self.assertEqual(list(combinatorics.searchDigitPerms([1, 1, 2])),
+                         [(1, 1, 2), (1, 2, 1), (2, 1, 1)])
+
+        check = combinatorics.allOf(
+            combinatorics.noLeadingZero,
+            combinatorics.substringDivisible([2, 3, 5], start=1),
+            combinatorics.lastDigitIn([0, 5], 5))
+        expected = [p for p in itertools.permutations(range(6), 5)
+                    if p[0] != 0
+                    and combinatorics.digitsToNumber(p[1:4]) % 2 == 0
+                    and combinatorics.digitsToNumber(p[2:5]) % 3 == 0
+                    and p[4] in (0, 5)]
+        self.assertEqual(list(combinatorics.searchDigitPerms(range(6), check,
+                                                             length=5)),
+                         expected)
+
+    def testDigitSumDivisible(self):
+        self.assertTrue(combinatorics.digitSumDivisible(range(1, 10)))
+        self.assertFalse(combinatorics.digitSumDivisible(range(1, 8)))
+        self.assertTrue(combinatorics.digitSumDivisible([3, 6, 9], 2))
+        self.assertFalse(combinatorics.digitSumDivisible([1, 2, 3], 2))
+
+    def testBinomialTable(self):
+        exact = combinatorics.BinomialTable(60)
+        self.assertEqual(exact.choose(40, 20), 137846528820)
+        self.assertRaises(ValueError, exact.choose, 61, 3)
+
+        mod = 10 ** 9 + 7
+        table = combinatorics.BinomialTable(500, mod)
+        pairs = [(n, k) for n in xrange(501) for k in xrange(-1, n + 2, 7)]
+        self.assertEqual(table.chooseAll(pairs),
+                         [combinatorics.choose(n, k) % mod for n, k in pairs])
+
+    def testLucas(self):
+        table = combinatorics.BinomialTable(12, 13)
+        for n in xrange(200):
+            for k in xrange(n + 1):
+                self.assertEqual(table.choose(n, k),
+                                 combinatorics.choose(n, k) % 13)
+
+        # base 13 digit 5 of k exceeds that of n in the first case.
+        self.assertEqual(table.choose(13 ** 10, 13 ** 5), 0)
+        self.assertEqual(table.choose(13 ** 10 + 2 * 13 ** 5, 13 ** 5), 2)
+        self.assertRaises(ValueError,
+                          combinatorics.BinomialTable(5, 13).choose, 20, 3)
+
+    def testCompositeModulus(self):
+        for mod in (1, 4, 12, 561, 3 * (10 ** 9 + 7)):
+            self.assertRaises(ValueError, combinatorics.BinomialTable, 20, mod)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,530 @@
+from fractions import Fraction
+from math import atan2, cos, pi, sin
+import random
+import unittest
+from algos import geom_2d
+
+"""Unit tests for the geom_2d module in algos package.
+"""
+
+def random_points(count, span=1000, seed=1):
+    rand = random.Random(seed)
+    return [(rand.randint(-span, span), rand.randint(-span, span))
+            for _ in xrange(count)]
+
+
+def exact_sign(value):
+    return (value > 0) - (value < 0)
+
+
+class PredicatesTestCase(unittest.TestCase):
+    def testOrientationNearDegenerate(self):
+        # naive float evaluation gets many of these signs wrong.
+        ulp = 2.0 ** -53
+        for i in xrange(64):
+            for j in xrange(64):
+                pt = (0.5 + i * ulp, 0.5 + j * ulp)
+                exact = [tuple(Fraction(c) for c in p)
+                         for p in (pt, (12.0, 12.0), (24.0, 24.0))]
+                self.assertEqual(
+                    exact_sign(geom_2d.orientation(pt, (12.0, 12.0),
+                                                   (24.0, 24.0))),
+                    exact_sign(geom_2d.orientation(*exact)))
+
+    def testInCircle(self):
+        tri = [(0, 0), (2, 0), (0, 2)]
+        self.assertTrue(geom_2d.in_circle(*(tri + [(1, 1)])) > 0)
+        self.assertEqual(geom_2d.in_circle(*(tri + [(2, 2)])), 0)
+        self.assertTrue(geom_2d.in_circle(*(tri + [(3, 3)])) < 0)
+
+        # on the unit circle up to rounding, the float filter can't decide.
+        rand = random.Random(7)
+        for _ in xrange(200):
+            angles = sorted(rand.uniform(0, 6.28) for _ in xrange(4))
+            pts = [(cos(a), sin(a)) for a in angles]
+            exact = [tuple(Fraction(c) for c in pt) for pt in pts]
+            self.assertEqual(exact_sign(geom_2d.in_circle(*pts)),
+                             exact_sign(geom_2d.in_circle(*exact)))
+
+    def testSegments(self):
+        self.assertEqual(geom_2d.lines_intersect((0, 0), (2, 2), (0, 2),
+                                                 (2, 0)), (1.0, 1.0))
+        self.assertEqual(geom_2d.lines_intersect((0, 0), (1, 1), (0, 2),
+                                                 (2, 0), segments=True),
+                         (1.0, 1.0))
+        self.assertEqual(geom_2d.lines_intersect((0, 0), (1, 0), (3, 1),
+                                                 (3, 2)), (3.0, 0.0))
+        self.assertEqual(geom_2d.lines_intersect((0, 0), (1, 0), (3, 1),
+                                                 (3, 2), segments=True), None)
+        self.assertEqual(geom_2d.lines_intersect((0, 0), (1, 1), (1, 0),
+                                                 (2, 1)), None)
+
+        self.assertTrue(geom_2d.point_on_segment((0.1, 0.2), (0, 0),
+                                                 (0.5, 1.0)))
+        self.assertFalse(geom_2d.point_on_segment((0.5, 1.0), (0, 0),
+                                                  (0.1, 0.2)))
+        self.assertTrue(geom_2d.segments_intersect(((0, 0), (2, 0)),
+                                                   ((1, 0), (3, 0))))
+        self.assertFalse(geom_2d.segments_intersect(((0, 0), (2, 0)),
+                                                    ((3, 0), (4, 0))))
+        self.assertTrue(geom_2d.segments_intersect(((1, 1), (1, 1)),
+                                                   ((0, 0), (2, 2))))
+
+    def testTurnAngle(self):
+        self.assertAlmostEqual(geom_2d.turn_angle((1, 0), (0, 1)), pi / 2)
+        self.assertAlmostEqual(geom_2d.turn_angle((1, 0), (-1, 0)), pi)
+        self.assertAlmostEqual(geom_2d.turn_angle((1, 0), (0, -3)),
+                               3 * pi / 2)
+        self.assertEqual(geom_2d.turn_angle((0, 0), (1, 1)), 0)
+
+
+class ConvexHullTestCase(unittest.TestCase):
+    def testSquare(self):
+        pts = [(0, 0), (2, 0), (2, 2), (0, 2), (1, 1), (1, 0), (0, 0)]
+        self.assertEqual(geom_2d.convex_hull(pts),
+                         [(0, 0), (2, 0), (2, 2), (0, 2)])
+
+    def testStartsAtLowestPoint(self):
+        pts = [(0, 1), (3, -1), (5, 2), (1, 4)]
+        self.assertEqual(geom_2d.convex_hull(pts),
+                         [(3, -1), (5, 2), (1, 4), (0, 1)])
+
+    def testRandomPoints(self):
+        pts = random_points(2000)
+        hull = geom_2d.convex_hull(pts)
+        size = len(hull)
+        for i in xrange(size):
+            pt1, pt2 = hull[i], hull[(i + 1) % size]
+            # strictly convex and counter clockwise.
+            self.assertTrue(geom_2d.orientation(pt1, pt2,
+                                                hull[(i + 2) % size]) > 0)
+            # every point is on the left of (or on) every edge.
+            self.assertTrue(all(geom_2d.orientation(pt1, pt2, pt) >= 0
+                                for pt in pts))
+
+    def testDegenerate(self):
+        self.assertEqual(geom_2d.convex_hull([(1, 1)]), [(1, 1)])
+        self.assertEqual(geom_2d.convex_hull([(0, 0), (1, 1), (2, 2)]),
+                         [(0, 0), (2, 2)])
+
+
+class DynamicHullTestCase(unittest.TestCase):
+    def testMatchesConvexHull(self):
+        pts = random_points(500, span=30, seed=4)
+        hull = geom_2d.DynamicHull()
+        for i, pt in enumerate(pts):
+            hull.insert(pt)
+            if i % 25 == 0:
+                self.assertEqual(hull.hull(), geom_2d.convex_hull(pts[:i + 1]))
+        self.assertEqual(hull.hull(), geom_2d.convex_hull(pts))
+        self.assertFalse(hull.insert((0, 0)))
+        self.assertEqual(geom_2d.DynamicHull([(2, 2), (0, 0), (1, 1)]).hull(),
+                         [(0, 0), (2, 2)])
+
+    def testQueries(self):
+        pts = random_points(200, seed=5)
+        hull = geom_2d.DynamicHull(pts)
+        verts = geom_2d.convex_hull(pts)
+        size = len(verts)
+        for query in random_points(300, span=2000, seed=6) + verts:
+            inside = all(geom_2d.orientation(verts[i], verts[(i + 1) % size],
+                                             query) >= 0 for i in xrange(size))
+            self.assertEqual(query in hull, inside)
+            if inside:
+                self.assertRaises(ValueError, hull.tangents, query)
+                continue
+
+            right, left = hull.tangents(query)
+            self.assertTrue(all(geom_2d.orientation(query, right, pt) >= 0
+                                for pt in verts))
+            self.assertTrue(all(geom_2d.orientation(query, left, pt) <= 0
+                                for pt in verts))
+
+    def testSmallHulls(self):
+        hull = geom_2d.DynamicHull()
+        self.assertEqual(len(hull), 0)
+        self.assertRaises(ValueError, hull.tangents, (1, 1))
+        hull.insert((0, 0))
+        self.assertEqual(hull.tangents((1, 1)), ((0, 0), (0, 0)))
+        hull.insert((2, 0))
+        self.assertEqual(len(hull), 2)
+        self.assertEqual(hull.tangents((1, 1)), ((0, 0), (2, 0)))
+        self.assertEqual(hull.tangents((1, -1)), ((2, 0), (0, 0)))
+
+
+class RotatingCalipersTestCase(unittest.TestCase):
+    def hulls(self):
+        for seed in xrange(8):
+            yield geom_2d.convex_hull(random_points(200, span=1000,
+                                                    seed=seed))
+
+    def edge_rectangles(self, hull):
+        """(width, height) of the rectangle on every edge, by brute force"""
+        for i in xrange(len(hull)):
+            pt1, pt2 = hull[i - 1], hull[i]
+            edge = (pt2[0] - pt1[0], pt2[1] - pt1[1])
+            length = geom_2d.vector_magnitude(edge)
+            along = [geom_2d.dot_product(edge, pt) / length for pt in hull]
+            above = [geom_2d.orientation(pt1, pt2, pt) / length for pt in hull]
+            yield max(along) - min(along), max(above)
+
+    def testDiameter(self):
+        for hull in self.hulls():
+            dist, pt1, pt2 = geom_2d.hull_diameter(hull)
+            self.assertEqual(dist, max(geom_2d.point_dist(p, q)
+                                       for p in hull for q in hull))
+            self.assertEqual(geom_2d.point_dist(pt1, pt2), dist)
+
+        self.assertEqual(geom_2d.hull_diameter([(1, 1)]), (0, (1, 1), (1, 1)))
+        self.assertEqual(geom_2d.hull_diameter([]), None)
+
+    def testWidth(self):
+        for hull in self.hulls():
+            heights = [h for _, h in self.edge_rectangles(hull)]
+            self.assertAlmostEqual(geom_2d.hull_width(hull), min(heights))
+        self.assertEqual(geom_2d.hull_width([(0, 0), (3, 3)]), 0.0)
+
+    def testRectangles(self):
+        for hull in self.hulls():
+            rects = list(self.edge_rectangles(hull))
+            area, corners = geom_2d.min_area_rectangle(hull)
+            self.assertAlmostEqual(area, min(w * h for w, h in rects))
+            self.assertAlmostEqual(geom_2d.poly_area(corners), area, 4)
+
+            perimeter, corners = geom_2d.min_perimeter_rectangle(hull)
+            self.assertAlmostEqual(perimeter,
+                                   min(2 * (w + h) for w, h in rects))
+            for pt in hull:
+                self.assertTrue(all(geom_2d.orientation(
+                    corners[i - 1], corners[i], pt) >= -1e-6 * perimeter
+                                    for i in xrange(4)))
+
+        square = [(0, 0), (2, 0), (2, 2), (0, 2)]
+        self.assertEqual(geom_2d.min_area_rectangle(square),
+                         (4.0, [(0, 0), (2, 0), (2, 2), (0, 2)]))
+        self.assertEqual(geom_2d.min_perimeter_rectangle([(0, 0), (3, 4)]),
+                         (10.0, [(0, 0), (3, 4), (3, 4), (0, 0)]))
+
+
+class KDTreeTestCase(unittest.TestCase):
+    def setUp(self):
+        self.pts = random_points(1500, span=100)
+        self.tree = geom_2d.KDTree(self.pts)
+        self.queries = random_points(40, span=120, seed=7)
+
+    def testNearest(self):
+        for query in self.queries:
+            dists = sorted(geom_2d.point_dist(query, pt) for pt in self.pts)
+            found = self.tree.nearest(query, k=5)
+            self.assertEqual([geom_2d.point_dist(query, pt) for pt in found],
+                             dists[:5])
+        self.assertEqual(self.tree.nearest((0, 0), k=0), [])
+        self.assertEqual(len(self.tree.nearest((0, 0), k=2000)), 1500)
+
+    def testWithinRadius(self):
+        for query in self.queries:
+            expected = [pt for pt in self.pts
+                        if geom_2d.point_dist(query, pt) <= 15]
+            self.assertEqual(sorted(self.tree.within_radius(query, 15)),
+                             sorted(expected))
+
+    def testInRectangle(self):
+        for (px1, py1) in self.queries:
+            lower, upper = (px1 - 20, py1 - 10), (px1 + 5, py1 + 30)
+            expected = [(x, y) for x, y in self.pts
+                        if lower[0] <= x <= upper[0]
+                        and lower[1] <= y <= upper[1]]
+            self.assertEqual(sorted(self.tree.in_rectangle(lower, upper)),
+                             sorted(expected))
+
+    def testClosestPair(self):
+        for count in (2, 3, 5, 50, 700):
+            pts = random_points(count, span=10 ** 6, seed=count)
+            dist, pt1, pt2 = geom_2d.closest_pair(pts)
+            self.assertEqual(dist, min(geom_2d.point_dist(p, q)
+                                       for i, p in enumerate(pts)
+                                       for q in pts[i + 1:]))
+            self.assertEqual(geom_2d.point_dist(pt1, pt2), dist)
+
+        self.assertEqual(geom_2d.closest_pair([(1, 1)]), None)
+        self.assertEqual(geom_2d.closest_pair([(1, 1), (5, 5), (1, 1)])[0], 0)
+
+
+class DelaunayTestCase(unittest.TestCase):
+    def assertDelaunay(self, pts):
+        tri = geom_2d.DelaunayTriangulation(pts)
+        area = 0
+        for i, j, k in tri.triangles():
+            self.assertTrue(geom_2d.orientation(pts[i], pts[j], pts[k]) > 0)
+            # empty circumcircles.
+            self.assertTrue(all(geom_2d.in_circle(pts[i], pts[j], pts[k],
+                                                  pt) <= 0 for pt in pts))
+            area += geom_2d.orientation(pts[i], pts[j], pts[k])
+
+        # the triangles tile the hull.
+        hull = geom_2d.convex_hull(pts)
+        self.assertEqual(area, sum(geom_2d.orientation(hull[0], hull[i],
+                                                       hull[i + 1])
+                                   for i in xrange(1, len(hull) - 1)))
+        edges = set(tri.edges())
+        for i in xrange(len(pts)):
+            self.assertTrue(all((min(i, j), max(i, j)) in edges
+                                for j in tri.neighbours(i)))
+        return tri
+
+    def testRandomPoints(self):
+        tri = self.assertDelaunay(random_points(300, seed=8))
+        # every nearest neighbour is a delaunay neighbour.
+        pts = tri.points
+        for i, pt in enumerate(pts[:50]):
+            nearest = min((geom_2d.point_dist(pt, q), j)
+                          for j, q in enumerate(pts) if q != pt)[1]
+            self.assertTrue(nearest in tri.neighbours(i))
+
+    def testDegenerate(self):
+        self.assertDelaunay([(x, y) for x in xrange(6) for y in xrange(6)])
+        tri = self.assertDelaunay([(3, 3), (0, 0), (1, 1), (1, 1), (2, 2)])
+        self.assertEqual(sorted(tri.edges()), [(0, 4), (1, 2), (2, 4)])
+        self.assertEqual(tri.neighbours(3), [])
+        self.assertEqual(tri.triangles(), [])
+        self.assertEqual(geom_2d.DelaunayTriangulation([(1, 1)]).edges(), [])
+
+    def testVoronoi(self):
+        pts = [(0, 0), (4, 0), (0, 4), (4, 4), (2, 1)]
+        tri = geom_2d.DelaunayTriangulation(pts)
+        vertices, ridges = tri.voronoi()
+        self.assertEqual(len(vertices), 4)
+        self.assertEqual(len(ridges), len(tri.edges()))
+        for i, j, left, right in ridges:
+            for end in (left, right):
+                if end is not None:
+                    self.assertAlmostEqual(
+                        geom_2d.point_dist(vertices[end], pts[i]),
+                        geom_2d.point_dist(vertices[end], pts[j]))
+            # only the hull edges have a ridge going to infinity.
+            on_hull = (i, j) in [(0, 1), (1, 3), (3, 2), (2, 0)] or \
+                (j, i) in [(0, 1), (1, 3), (3, 2), (2, 0)]
+            self.assertEqual(None in (left, right), on_hull)
+
+
+class SegmentIntersectionTestCase(unittest.TestCase):
+    def testSimpleCases(self):
+        segs = [((0, 0), (4, 4)), ((0, 4), (4, 0)), ((2, 0), (2, 5)),
+                ((5, 5), (6, 6)), ((4, 4), (5, 5)), ((1, 3), (3, 3))]
+        self.assertEqual(geom_2d.segment_intersections(segs),
+                         [((1, 3), [1, 5]), ((2, 2), [0, 1, 2]),
+                          ((2, 3), [2, 5]), ((3, 3), [0, 5]),
+                          ((4, 4), [0, 4]), ((5, 5), [3, 4])])
+
+        crossing = geom_2d.segment_intersections([((0, 0), (1, 2)),
+                                                  ((0, 1), (1, 0))])
+        self.assertEqual(crossing, [((Fraction(1, 3), Fraction(2, 3)),
+                                     [0, 1])])
+
+    def testOverlapping(self):
+        segs = [((0, 0), (4, 0)), ((2, 0), (6, 0)), ((3, 0), (3, 0))]
+        self.assertEqual(geom_2d.segment_intersections(segs),
+                         [((2, 0), [0, 1]), ((3, 0), [0, 1, 2]),
+                          ((4, 0), [0, 1])])
+
+    def testAgainstPairwise(self):
+        rand = random.Random(5)
+        for _ in xrange(150):
+            span = rand.choice([3, 6, 1000])
+            segs = [((rand.randint(0, span), rand.randint(0, span)),
+                     (rand.randint(0, span), rand.randint(0, span)))
+                    for _ in xrange(rand.randint(1, 10))]
+            found = geom_2d.segment_intersections(segs)
+            self.assertEqual(found, pairwise_intersections(segs))
+            self.assertEqual(geom_2d.any_segments_intersect(segs),
+                             bool(found))
+
+
+def pairwise_intersections(segs):
+    """O(n^2) reference for segment_intersections"""
+    def on_segment(pt, (pt1, pt2)):
+        return geom_2d.orientation(pt1, pt2, pt) == 0 and \
+            min(pt1, pt2) <= pt <= max(pt1, pt2)
+
+    shared = {}
+    for i, seg1 in enumerate(segs):
+        for j in xrange(i + 1, len(segs)):
+            seg2 = segs[j]
+            pts = [pt for pt in seg1 if on_segment(pt, seg2)] + \
+                [pt for pt in seg2 if on_segment(pt, seg1)]
+            if geom_2d.orientation(seg1[0], seg1[1], seg2[0]) != 0 or \
+                    geom_2d.orientation(seg1[0], seg1[1], seg2[1]) != 0:
+                pts = []
+            crossing = geom_2d._exact_segment_intersection(seg1, seg2)
+            for pt in pts + ([crossing] if crossing else []):
+                shared.setdefault(pt, set()).update([i, j])
+    return sorted((pt, sorted(idx)) for pt, idx in shared.items())
+
+
+def star_polygon(count, span, seed):
+    """Random simple polygon, points sorted by angle around the origin"""
+    pts = set(random_points(count, span, seed)) - set([(0, 0)])
+    return sorted(pts, key=lambda (x, y): atan2(y, x))
+
+
+class PointInPolygonTestCase(unittest.TestCase):
+    def testPointInPolygon(self):
+        square = [(0, 0), (4, 0), (4, 4), (0, 4)]
+        self.assertTrue(geom_2d.point_in_polygon((2, 2), square))
+        self.assertTrue(geom_2d.point_in_polygon((4, 1), square))
+        self.assertTrue(geom_2d.point_in_polygon((0, 0), square))
+        self.assertFalse(geom_2d.point_in_polygon((5, 2), square))
+        self.assertFalse(geom_2d.point_in_polygon((2, -1), square))
+        self.assertTrue(geom_2d.point_in_polygon((1, 3), square[::-1]))
+
+    def check_index(self, index, poly, queries):
+        expected = [geom_2d.point_in_polygon(pt, poly) for pt in queries]
+        self.assertEqual([index.contains(pt) for pt in queries], expected)
+        self.assertEqual(list(index.contains_all(queries)), expected)
+
+    def testConvexIndex(self):
+        queries = random_points(3000, span=25, seed=3)
+        for seed in xrange(5):
+            hull = geom_2d.convex_hull(random_points(30, span=20, seed=seed))
+            self.check_index(geom_2d.ConvexPolygonIndex(hull), hull, queries)
+
+        for degenerate in ([], [(1, 1)], [(0, 0), (4, 2)]):
+            self.check_index(geom_2d.ConvexPolygonIndex(degenerate),
+                             degenerate, [(1, 1), (2, 1), (3, 1)])
+
+    def testPolygonIndex(self):
+        queries = random_points(3000, span=25, seed=4)
+        for seed in xrange(5):
+            poly = star_polygon(40, 20, seed)
+            self.check_index(geom_2d.PolygonIndex(poly), poly, queries)
+
+        # vertical edges and a reflex vertex.
+        poly = [(0, 0), (6, 0), (6, 6), (3, 2), (0, 6)]
+        queries = [(x, y) for x in xrange(-1, 8) for y in xrange(-1, 8)]
+        self.check_index(geom_2d.PolygonIndex(poly), poly, queries)
+
+    def testFloatPointsOnEdges(self):
+        # on the boundary up to rounding, where a float sign can be wrong.
+        rand = random.Random(12)
+        for seed in xrange(5):
+            hull = geom_2d.convex_hull([(rand.uniform(-20, 20),
+                                         rand.uniform(-20, 20))
+                                        for _ in xrange(30)])
+            poly = [(x + 0.1 * rand.random(), y + 0.1 * rand.random())
+                    for x, y in star_polygon(40, 20, seed)]
+            for index, verts in ((geom_2d.ConvexPolygonIndex(hull), hull),
+                                 (geom_2d.PolygonIndex(poly), poly)):
+                queries = []
+                for _ in xrange(300):
+                    i, ratio = rand.randrange(len(verts)), rand.random()
+                    (px1, py1), (px2, py2) = verts[i - 1], verts[i]
+                    queries.append((px1 + ratio * (px2 - px1),
+                                    py1 + ratio * (py2 - py1)))
+                self.assertEqual(list(index.contains_all(queries)),
+                                 map(index.contains, queries))
+
+    def testVerticesBeyondFloats(self):
+        # 2 ** 60 + 1 has no exact float, the batch query can't round it.
+        big = 2 ** 60
+        poly = [(0, 0), (big, 0), (big, big + 1), (0, big + 1)]
+        queries = [(big, 5), (big + 1, 5), (big // 2, big + 1), (3, big + 2)]
+        for index in (geom_2d.ConvexPolygonIndex(poly),
+                      geom_2d.PolygonIndex(poly)):
+            self.assertEqual(list(index.contains_all(queries)),
+                             [True, False, True, False])
+
+    def testThinPolygonBeyondFloats(self):
+        # the edges of a slab are too close together for floats to order.
+        big = 2 ** 60
+        poly = [(0, 0), (big, big), (big, big + 64)]
+        self.assertTrue(geom_2d.PolygonIndex(poly).contains((big - 1,
+                                                            big + 10)))
+
+        rand = random.Random(5)
+        for poly, spread in [(poly, 70),
+                             ([(0, 0), (big, big), (2 * big, big + 3),
+                               (big, big + 2), (Fraction(1, 3), 1)], 5)]:
+            index = geom_2d.PolygonIndex(poly)
+            for _ in xrange(300):
+                x = rand.randint(-1, 2 * big + 1)
+                pt = (x, min(x, big) + rand.randint(-2, spread))
+                self.assertEqual(index.contains(pt),
+                                 geom_2d.point_in_polygon(pt, poly))
+
+    def testPointArrayQueries(self):
+        hull = geom_2d.convex_hull(random_points(30, span=20))
+        queries = random_points(500, span=25, seed=9)
+        index = geom_2d.ConvexPolygonIndex(hull)
+        self.assertEqual(list(index.contains_all(geom_2d.PointArray(queries))),
+                         [index.contains(pt) for pt in queries])
+
+
+class PointArrayTestCase(unittest.TestCase):
+    def check_batch_routines(self):
+        pts1, pts2, pts3 = [random_points(50, seed=s) for s in (1, 2, 3)]
+        arr1, arr2, arr3 = [geom_2d.PointArray(p) for p in (pts1, pts2, pts3)]
+
+        self.assertEqual(len(arr1), 50)
+        self.assertEqual(arr1.to_list(), pts1)
+        self.assertEqual(list(geom_2d.cross_product(arr1, arr2)),
+                         map(geom_2d.cross_product, pts1, pts2))
+        self.assertEqual(list(geom_2d.dot_product(arr1, (3, -2))),
+                         [geom_2d.dot_product(p, (3, -2)) for p in pts1])
+        self.assertEqual(list(geom_2d.point_dist(arr1, arr2)),
+                         map(geom_2d.point_dist, pts1, pts2))
+        self.assertEqual(list(geom_2d.tri_area(arr1, arr2, arr3)),
+                         map(geom_2d.tri_area, pts1, pts2, pts3))
+
+        pts = random_points(3000)
+        hull = geom_2d.convex_hull(pts)
+        arr = geom_2d.PointArray(pts)
+        self.assertEqual(geom_2d.convex_hull(arr), hull)
+        self.assertEqual(geom_2d.poly_area(geom_2d.PointArray(hull)),
+                         geom_2d.poly_area(hull))
+
+        self.assertRaises(ValueError, geom_2d.PointArray.from_xy, [1, 2], [3])
+
+    @unittest.skipIf(geom_2d.numpy is None, "numpy is not installed")
+    def testNumpyBacked(self):
+        self.check_batch_routines()
+
+    @unittest.skipIf(geom_2d.numpy is None, "numpy is not installed")
+    def testHullNearDegenerate(self):
+        # float points on the edges of the octagon of extreme points, on
+        # either side of it after rounding, must not be filtered out.
+        rand = random.Random(3)
+        directions = [(0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1),
+                      (1, 0), (1, 1)]
+        for _ in xrange(200):
+            pts = [(rand.uniform(-10, 10), rand.uniform(-10, 10))
+                   for _ in xrange(20)]
+            corners = [min(pts, key=lambda (x, y): dx * x + dy * y)
+                       for dx, dy in directions]
+            for (px1, py1), (px2, py2) in zip(corners,
+                                              corners[1:] + corners[:1]):
+                for _ in xrange(20):
+                    ratio = rand.random()
+                    pts.append((px1 + ratio * (px2 - px1),
+                                py1 + ratio * (py2 - py1)))
+            self.assertEqual(geom_2d.convex_hull(geom_2d.PointArray(pts)),
+                             geom_2d.convex_hull(pts))
+
+    def testHullCoincident(self):
+        # enough copies of one point to go through the prefilter.
+        for pts in [[(2.0, 3.0)] * 16, [(2.0, 3.0)] * 40 + [(5.0, -1.0)] * 40]:
+            self.assertEqual(geom_2d.convex_hull(geom_2d.PointArray(pts)),
+                             geom_2d.convex_hull(pts))
+        self.assertEqual(
+            geom_2d.convex_hull(geom_2d.PointArray([(2.0, 3.0)] * 16)),
+            [(2.0, 3.0)])
+
+    def testArrayBacked(self):
+        numpy, geom_2d.numpy = geom_2d.numpy, None
+        try:
+            self.check_batch_routines()
+        finally:
+            geom_2d.numpy = numpy
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,6 @@
+from itertools import islice
+import shutil
+import tempfile
 import unittest
 from algos import primes
 
@@ -14,6 +17,215 @@ class PrimesTestCase(unittest.TestCase):
             primality = primes.checkIfPrime(n)
             self.assertTrue(not (inclusion ^ primality))
 
+    def testMillerRabin(self):
+        flags = set(primes.getPrimeList(200000))
+        for n in xrange(-5, 200000):
+            self.assertEqual(primes.checkIfPrime(n), n in flags)
+
+        # strong pseudoprimes to several small bases.
+        for n in [2047, 1373653, 25326001, 3215031751, 2152302898747,
+                  3474749660383, 341550071728321, 3825123056546413051]:
+            self.assertFalse(primes.checkIfPrime(n))
+
+        self.assertTrue(primes.checkIfPrime(2 ** 61 - 1))
+        self.assertTrue(primes.checkIfPrime(2 ** 127 - 1))
+        self.assertFalse(primes.checkIfPrime((2 ** 61 - 1) * (2 ** 31 - 1)))
+
+    def testArePrimes(self):
+        dense = range(-3, 5000)
+        self.assertEqual(primes.are_primes(dense),
+                         map(primes.checkIfPrime, dense))
+
+        sparse = [10 ** 12 + k for k in xrange(100)] + [2, 13, 1, 0]
+        self.assertEqual(primes.are_primes(sparse),
+                         map(primes.checkIfPrime, sparse))
+        self.assertEqual(primes.are_primes([]), [])
+
+    def testFactorize(self):
+        def expand(factors):
+            return reduce(lambda acc, (p, e): acc * p ** e, factors, 1)
+
+        spf = primes.getSpfTable(10000)
+        for n in xrange(1, 10001):
+            factors = primes.factorize(n)
+            self.assertEqual(primes.factorize(n, spf), factors)
+            self.assertEqual(expand(factors), n)
+            self.assertTrue(all(primes.checkIfPrime(p) for p, _ in factors))
+
+        self.assertEqual(primes.factorize(600851475143),
+                         [(71, 1), (839, 1), (1471, 1), (6857, 1)])
+        self.assertEqual(primes.factorize(999999000001 * 999999000001 * 8),
+                         [(2, 3), (999999000001, 2)])
+        self.assertEqual(primes.factorize(1000000007 * 998244353 * 1000003),
+                         [(1000003, 1), (998244353, 1), (1000000007, 1)])
+        self.assertEqual(primes.numFactors(76576500), 576)
+
+    def testMultiplicativeTables(self):
+        n = 1000
+        tables = primes.getMultiplicativeTables(n)
+        for k in xrange(1, n+1):
+            factors = primes.factorize(k)
+            divisors = [d for d in xrange(1, k+1) if k % d == 0]
+            self.assertEqual(tables['tau'][k], len(divisors))
+            self.assertEqual(tables['sigma'][k], sum(divisors))
+            self.assertEqual(tables['phi'][k],
+                             len([d for d in xrange(1, k+1)
+                                  if primes.gcd(d, k) == 1]))
+            mu = 0 if any(e > 1 for _, e in factors) else \
+                (-1) ** len(factors)
+            self.assertEqual(tables['mu'][k], mu)
+
+        self.assertEqual(primes.getMultiplicativeTables(10, ('phi',)).keys(),
+                         ['phi'])
+        self.assertRaises(ValueError, primes.getMultiplicativeTables, 10,
+                          ('lambda',))
+
+    def testDivSum(self):
+        divSum = primes.getDivSum(300)
+        self.assertEqual(divSum[:2], [0, 0])
+        self.assertEqual(divSum[220], 284)
+        self.assertEqual(divSum[284], 220)
+        self.assertEqual(divSum[12], 16)
+        self.assertEqual(primes.getDivSum(0), [0])
+
+    def testPrimePi(self):
+        allPrimes = primes.getPrimeList(100000)
+        for x in range(-1, 2000) + [99990, 100000]:
+            self.assertEqual(primes.prime_pi(x),
+                             len([p for p in allPrimes if p <= x]))
+
+        self.assertEqual(primes.prime_pi(10 ** 9), 50847534)
+
+    def testPrimeCache(self):
+        cacheDir = tempfile.mkdtemp()
+        try:
+            small = primes.loadPrimes(5000, cacheDir)
+            self.assertEqual(list(small), primes.getPrimeList(5000))
+            self.assertEqual(small[-1], 4999)
+            self.assertEqual(small[3:6], [7, 11, 13])
+            self.assertTrue(4999 in small and 4998 not in small)
+
+            # served by the same file.
+            self.assertEqual(list(primes.loadPrimes(100, cacheDir)),
+                             primes.getPrimeList(100))
+
+            large = primes.loadPrimes(200000, cacheDir)
+            self.assertEqual(list(large), primes.getPrimeList(200000))
+            self.assertEqual(len(large), 17984)
+
+            # plain ints, as getPrimeList gives.
+            for values in [list(large), large[1:3], large[::1000],
+                           [large[0], large[-1]]]:
+                self.assertEqual(set(map(type, values)), set([int]))
+        finally:
+            shutil.rmtree(cacheDir)
+
+    def testGenPrimes(self):
+        generated = list(islice(primes.genPrimes(), 200000))
+        self.assertEqual(generated, primes.getPrimeList(generated[-1]))
+        self.assertEqual(generated[10000], 104743)
+
+    def testParallelSieve(self):
+        block = primes.PARALLEL_BLOCK
+        primes.PARALLEL_BLOCK = 10000
+        try:
+            self.assertEqual(primes.getPrimeList(100003, processes=3),
+                             primes.getPrimeList(100003))
+            self.assertEqual(
+                list(primes.primes_in_range(99000, 150001, processes=2)),
+                list(primes.primes_in_range(99000, 150001)))
+        finally:
+            primes.PARALLEL_BLOCK = block
+
+    def testParallelSieveTypes(self):
+        block, packedMax = primes.PARALLEL_BLOCK, primes._PACKED_MAX
+        primes.PARALLEL_BLOCK = 10000
+        try:
+            # blocks past the packed limit are sent as lists
+            for limit in [packedMax, 50000]:
+                primes._PACKED_MAX = limit
+                plist = primes.getPrimeList(100003, processes=2)
+                self.assertEqual(plist, primes.getPrimeList(100003))
+                self.assertEqual(set(map(type, plist)), set([int]))
+                self.assertEqual(
+                    set(map(type, primes.primes_in_range(1, 100003,
+                                                         processes=2))),
+                    set([int]))
+        finally:
+            primes.PARALLEL_BLOCK = block
+            primes._PACKED_MAX = packedMax
+
+    def testPrimeBitmap(self):
+        for n in [0, 1, 5, 7, 29, 30, 31, 4000, 123457]:
+            bitmap = primes.PrimeBitmap(n)
+            plist = primes.getPrimeList(n)
+            pset = set(plist)
+            for k in xrange(-2, n+1):
+                self.assertEqual(bitmap.is_prime(k), k in pset)
+            for k in xrange(0, n+1, max(1, n // 1000)):
+                self.assertEqual(bitmap.count_upto(k),
+                                 len([p for p in plist if p <= k]))
+            self.assertEqual(len(bitmap), len(plist))
+            self.assertEqual([bitmap.nth_prime(i)
+                              for i in xrange(1, len(plist)+1)], plist)
+
+        bitmap = primes.PrimeBitmap(1000)
+        self.assertRaises(ValueError, bitmap.is_prime, 1001)
+        self.assertRaises(IndexError, bitmap.nth_prime, 169)
+
+    def testSummatoryFunctions(self):
+        n = 3000
+        plist = primes.getPrimeList(n)
+        tables = primes.getMultiplicativeTables(n, ('mu', 'phi'))
+        for x in xrange(0, n+1, 7):
+            self.assertEqual(primes.prime_sum(x), sum(p for p in plist
+                                                      if p <= x))
+            self.assertEqual(primes.mertens(x), sum(tables['mu'][1:x+1]))
+            self.assertEqual(primes.totient_sum(x), sum(tables['phi'][1:x+1]))
+
+        self.assertEqual(primes.prime_sum(2000000), 142913828922)
+        self.assertEqual(primes.mertens(10 ** 8), 1928)
+        self.assertEqual(primes.totient_sum(10 ** 6), 303963552392)
+
+    @unittest.skipIf(primes.numpy is None, "numpy is not installed")
+    def testNumpyBackend(self):
+        for n in [0, 1, 2, 3, 4, 100, 100001]:
+            self.assertEqual(primes.getPrimeList(n, backend='numpy'),
+                             primes.getPrimeList(n))
+            self.assertEqual(primes.getDivSum(n, backend='numpy'),
+                             primes.getDivSum(n))
+
+        arr = primes.getPrimeList(1000, backend='numpy', asArray=True)
+        self.assertEqual(arr.sum(), 76127)
+        self.assertEqual(primes.getDivSum(300, backend='numpy',
+                                          asArray=True)[220], 284)
+
+    def testBackendFallback(self):
+        numpy, primes.numpy = primes.numpy, None
+        try:
+            self.assertEqual(primes.getPrimeList(100, backend='numpy'),
+                             primes.getPrimeList(100))
+            self.assertEqual(primes.getDivSum(100, backend='numpy'),
+                             primes.getDivSum(100))
+        finally:
+            primes.numpy = numpy
+        self.assertRaises(ValueError, primes.getPrimeList, 100, backend='c')
+
+    def testSegmentedSieve(self):
+        for n in [0, 1, 2, 3, 10, 97, 1000, 100003]:
+            self.assertEqual(primes.getPrimeList(n, segmented=True),
+                             primes.getPrimeList(n, segmented=False))
+
+    def testPrimesInRange(self):
+        allPrimes = primes.getPrimeList(2000000)
+        for lo, hi in [(0, 100), (2, 2), (24, 28), (999000, 1001000),
+                       (1, 2000000)]:
+            expected = [p for p in allPrimes if lo <= p <= hi]
+            self.assertEqual(list(primes.primes_in_range(lo, hi)), expected)
+
+        big = list(primes.primes_in_range(10**10, 10**10 + 1000))
+        self.assertEqual(big[:2], [10000000019, 10000000033])
+
 
 if __name__ == '__main__':
     unittest.main()
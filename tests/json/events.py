@@ -0,0 +1,63 @@
+# a few unit tests for the event based parser.
+
+import json
+import jsonparser
+
+DATA_FILE = 'tests/eventtests.txt'
+
+def writeData(obj):
+    handle = open(DATA_FILE, 'w')
+    handle.write(json.dumps(obj))
+    handle.close()
+
+def testEvents():
+    writeData({"key1": [1, "two", None], "key2": {}})
+    jsonparser.initModule(DATA_FILE)
+    events = list(jsonparser.readEvents())
+
+    assert events[0] == (jsonparser.START_OBJECT, None)
+    assert events[-1] == (jsonparser.END_OBJECT, None)
+    # json.dumps doesn't keep the key order, check each pair on its own.
+    i = events.index((jsonparser.KEY, "key1"))
+    assert events[i + 1:i + 6] == [
+        (jsonparser.START_ARRAY, None),
+        (jsonparser.VALUE, "1"),
+        (jsonparser.VALUE, "two"),
+        (jsonparser.VALUE, jsonparser.jsondata.JsonObject.jsonNullValue),
+        (jsonparser.END_ARRAY, None)]
+    i = events.index((jsonparser.KEY, "key2"))
+    assert events[i + 1:i + 3] == [(jsonparser.START_OBJECT, None),
+                                   (jsonparser.END_OBJECT, None)]
+    assert len(events) == 11
+
+    for bad in ['{"a" 1}', '[1, 2', '[1 2]', '']:
+        handle = open(DATA_FILE, 'w')
+        handle.write(bad)
+        handle.close()
+        jsonparser.initModule(DATA_FILE)
+        try:
+            list(jsonparser.readEvents())
+            assert False
+        except ValueError:
+            pass
+
+def testSubtrees():
+    items = [{"id": i, "tags": ["a", "b"], "extra": {"x": i}}
+             for i in xrange(1000)]
+    writeData({"items": items, "count": 1000})
+
+    jsonparser.initModule(DATA_FILE)
+    selected = list(jsonparser.readSubtrees(
+        lambda path: len(path) == 3 and path[2] == "tags"))
+    assert [path for path, _ in selected] == \
+        [("items", i, "tags") for i in xrange(1000)]
+    assert all(tags == ["a", "b"] for _, tags in selected)
+
+    jsonparser.initModule(DATA_FILE)
+    extras = list(jsonparser.readSubtrees(
+        lambda path: path[-1:] == ("extra",)))
+    assert extras[5][1].getObjByKey("x") == "5"
+
+if __name__ == '__main__':
+    testEvents()
+    testSubtrees()
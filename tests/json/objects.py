@@ -37,5 +37,14 @@ def main():
         assert readObj != None
         print readObj.getKeys()
 
+        # every token split across buffer refills.
+        default_chunk = jsonparser.CHUNK_SIZE
+        jsonparser.CHUNK_SIZE = 1
+        jsonparser.initModule(DATA_FILE)
+        smallObj = jsonparser.readJsonObject()
+        jsonparser.CHUNK_SIZE = default_chunk
+        assert smallObj != None
+        assert sorted(smallObj.getKeys()) == sorted(readObj.getKeys())
+
 if __name__ == '__main__':
     main()